@@ -1012,8 +1012,7 @@ def main():
             spot_coin=MARKET_NAME,  # e.g., "xyz:COPPER" for HIP-3 markets
             account_address=account_address,
             pair_name=MARKET_NAME,
-            update_threshold_bps=10.0,  # Less sensitive for grid trading
-            on_update_callback=lambda x: None
+            update_threshold_bps=10.0  # Less sensitive for grid trading
         )
         ws_client.start()
         print("WebSocket connected\n")
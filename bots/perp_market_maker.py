@@ -1259,8 +1259,7 @@ def main():
                 spot_coin=MARKET_NAME,  # For perps, just use the market name
                 account_address=account_address,
                 pair_name=MARKET_NAME,  # Use market name for fill matching
-                update_threshold_bps=UPDATE_THRESHOLD_BPS,
-                on_update_callback=lambda update_type: None
+                update_threshold_bps=UPDATE_THRESHOLD_BPS
             )
             ws_client.start()
             print("   ✅ WebSocket ready - real-time data enabled!")
@@ -7,13 +7,25 @@ Perp Lobster - Powered by Vibetrade.cc
 """
 
 import json
+import logging
+import logging.handlers
+import math
+import queue
 import time
 import sqlite3
 import argparse
 import sys
 import os
 import signal
+import threading
+import traceback
+import requests
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from types import MappingProxyType
 
 # Add lib directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
@@ -59,6 +71,14 @@ PERP_DEX = PERP_COIN.split(':')[0] if PERP_COIN and ':' in PERP_COIN else None
 # Decimal precision for prices and sizes
 PRICE_DECIMALS = CONFIG['exchange'].get('price_decimals', 2)  # Default to 2 for backward compatibility
 SIZE_DECIMALS = CONFIG['exchange'].get('size_decimals', 2)
+USE_PERP_ORACLE_PRICE = CONFIG['exchange'].get('use_perp_oracle_price', False)  # Config is immutable at runtime
+
+# Invariants precomputed at import time (config never changes at runtime)
+TEN_MIN_SEC = 10 * 60
+FIFTEEN_MIN_SEC = 15 * 60
+PRICE_SPEC = f".{PRICE_DECIMALS}f"   # Precomputed format specs - avoids
+SIZE_SPEC = f".{SIZE_DECIMALS}f"     # rebuilding the spec string per format
+EMERGENCY_SELL_THRESHOLD = CONFIG['safety'].get('emergency_sell_if_below_oracle_pct')
 
 # Load configuration values from config file
 MAX_POSITION_SIZE = CONFIG['position']['max_position_size']
@@ -67,6 +87,8 @@ TARGET_POSITION = CONFIG['position']['target_position']
 BASE_ORDER_SIZE = CONFIG['trading']['base_order_size']
 MIN_ORDER_SIZE = CONFIG['trading']['min_order_size']
 SIZE_INCREMENT = CONFIG['trading']['size_increment']
+SIZE_INCREMENT_INV = 1.0 / SIZE_INCREMENT        # Multiply beats divide on the hot path
+MAX_POSITION_SIZE_INV = 1.0 / MAX_POSITION_SIZE
 
 BASE_SPREAD_BPS = CONFIG['trading']['base_spread_bps']
 MIN_SPREAD_BPS = CONFIG['trading']['min_spread_bps']
@@ -81,11 +103,22 @@ MAX_ORACLE_JUMP_PCT = CONFIG['oracle']['max_oracle_jump_pct']
 MIN_SPREAD_TO_ORACLE_BPS = CONFIG['oracle']['min_spread_to_oracle_bps']
 
 UPDATE_INTERVAL_SECONDS = CONFIG['timing']['update_interval_seconds']
+COALESCE_SECONDS = 0.02  # Absorb burst orderbook events for 20ms before requoting
+FILL_SAFETY_NET_SECONDS = 60  # Periodic REST fills check to catch missed WS pushes
 FALLBACK_CHECK_SECONDS = CONFIG['timing'].get('fallback_check_seconds', 30)  # Default to 30s
 
 MAX_QUOTE_COUNT = CONFIG['safety']['max_quote_count']
 EMERGENCY_STOP_LOSS_PCT = CONFIG['safety']['emergency_stop_loss_pct']
 
+# Verbose balance/fill tracing - off by default so the happy path doesn't pay
+# for per-cycle debug prints (each print flushes stdout under the GIL)
+DEBUG = os.environ.get('MM_DEBUG', '0') == '1'
+
+# Per-iteration banner frames - on by default, set MM_BANNERS=0 to drop the
+# three extra log lines (and string builds) per wake on the hot path
+BANNERS = os.environ.get('MM_BANNERS', '1') == '1'
+BANNER = '#' * 80
+
 # ============================================================
 # GLOBAL STATE
 # ============================================================
@@ -110,7 +143,19 @@ current_ask_size = None
 last_inventory = None
 
 # Volatility circuit breaker state
-price_history = []  # List of (timestamp, price) tuples
+# Window extremes come from the monotonic deques below in amortized O(1) per
+# sample, so the scan cost no longer grows with history length.
+# Samples are stored as two parallel float columns (SoA) instead of a list of
+# (timestamp, price) tuples: ~8 packed bytes per value vs ~80 bytes of boxed
+# tuple, and eviction is a contiguous del of the leading slice.
+price_ts = array('d')  # timestamps, oldest first
+price_px = array('d')  # prices, same order
+# Monotonic deques for O(1) rolling min/max (Harter sliding-min algorithm):
+# min deques are ascending, max deques are descending; front holds the extreme
+min_dq_10 = deque()
+max_dq_10 = deque()
+min_dq_15 = deque()
+max_dq_15 = deque()
 circuit_breaker_active = False
 circuit_breaker_activated_at = None
 last_volatility_check = 0
@@ -121,10 +166,57 @@ metrics_capture = None
 last_fill_check_time = None
 last_fill_api_call = 0  # Track last time we called user_fills API
 
+# Fill dedup: WebSocket and REST can both deliver the same fill, so filter
+# duplicates in memory before they hit SQLite (INSERT OR IGNORE still pays
+# a B-tree lookup per duplicate). Bounded ring of recently-seen fill keys.
+_seen_fill_order = deque(maxlen=10000)
+_seen_fill_keys = set()
+
 # WebSocket integration
 ws_client = None
 use_websocket = True  # Can disable for fallback to REST-only mode
 
+# Monotonic clock for interval math - immune to NTP wall-clock jumps that
+# could wipe price history or wedge the circuit breaker
+_now = time.monotonic
+
+# Signature of the last successfully posted quote pair - lets update_quotes
+# skip the cancel/replace round-trips when a recomputed quote is identical
+_last_quote_sig = None
+
+# Parameter-set signature registered with the parameter manager on startup.
+# Built once at import (config is immutable at runtime) and frozen so nothing
+# can mutate it between the hash check and registration.
+BOT_PARAM_CONFIG = MappingProxyType({
+    'base_order_size': BASE_ORDER_SIZE,
+    'base_spread_bps': BASE_SPREAD_BPS,
+    'update_interval_seconds': UPDATE_INTERVAL_SECONDS,
+    'update_threshold_bps': CONFIG['timing']['update_threshold_bps'],
+    'target_position': TARGET_POSITION,
+    'max_position_size': MAX_POSITION_SIZE,
+    'inventory_skew_bps_per_unit': INVENTORY_SKEW_BPS_PER_UNIT,
+    'max_skew_bps': MAX_SKEW_BPS,
+    'inventory_skew_threshold': INVENTORY_SKEW_THRESHOLD,
+    'min_ask_buffer_bps': None,
+    'max_spot_perp_deviation_pct': CONFIG['safety']['max_spot_perp_deviation_pct'],
+    'smart_order_mgmt_enabled': CONFIG['safety']['smart_order_mgmt_enabled'],
+})
+
+# Persistent pool for issuing the independent per-cycle fetches concurrently
+_fetch_executor = ThreadPoolExecutor(max_workers=3)
+
+# Per-cycle log buffer: update_quotes appends lines here and flushes once,
+# so a cycle costs one stdout write instead of a syscall per print
+_log_buf = []
+_log = _log_buf.append
+
+def _flush_log():
+    """Emit buffered log lines as a single stdout write"""
+    if _log_buf:
+        sys.stdout.write("\n".join(_log_buf) + "\n")
+        sys.stdout.flush()
+        _log_buf.clear()
+
 # ============================================================
 # INITIALIZATION
 # ============================================================
@@ -174,9 +266,24 @@ print(f"WebSocket: Event-driven updates (~100ms)")
 print(f"Fallback Check: {FALLBACK_CHECK_SECONDS}s")
 print(f"{'='*80}\n")
 
+def _tune_http_session(api):
+    """Enlarge the SDK session's connection pool for concurrent fetches
+
+    The SDK already reuses one requests.Session (TLS keep-alive), but its
+    default pool holds few connections; the parallel per-cycle fetches would
+    otherwise open and discard extra sockets under load.
+    """
+    try:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        api.session.mount("https://", adapter)
+        api.session.mount("http://", adapter)
+    except Exception as e:
+        print(f"   ⚠️  Could not tune HTTP session: {e}")
+
 # Setup Hyperliquid API
 base_url = constants.MAINNET_API_URL
 info = Info(base_url=base_url, skip_ws=True, perp_dexs=["", "xyz", "flx"])
+_tune_http_session(info)
 
 # Create account from main wallet's private key (used for signing)
 account = Account.from_key(secret_key)
@@ -192,9 +299,15 @@ exchange = Exchange(
     perp_dexs=["", "xyz", "flx"]
 )
 
+_tune_http_session(exchange)
+
 # Auto-approve builder fee on first run (one-time, supports Perp Lobster development)
 ensure_builder_fee_approved(exchange)
 
+# Cache the builder config - it's constant for the process lifetime, so no need
+# to rebuild it on every order placement (invalidated in reinitialize_connections)
+BUILDER = get_builder()
+
 print("✓ Connected to Hyperliquid")
 print("✓ Spot and perp metadata loaded\n")
 
@@ -204,7 +317,7 @@ print("✓ Spot and perp metadata loaded\n")
 
 def reinitialize_connections():
     """Recreate API connections (fixes stale connections after sleep/VPN issues)"""
-    global info, exchange
+    global info, exchange, BUILDER
 
     try:
         print(f"   🔄 Reinitializing API connections...")
@@ -214,6 +327,7 @@ def reinitialize_connections():
 
         # Recreate Info object (fresh connection pool)
         new_info = Info(base_url=constants.MAINNET_API_URL, skip_ws=True, perp_dexs=["", "xyz", "flx"])
+        _tune_http_session(new_info)
 
         # Recreate Exchange object (fresh connection pool)
         account = Account.from_key(secret_key)
@@ -224,6 +338,7 @@ def reinitialize_connections():
             vault_address=vault_address,
             perp_dexs=["", "xyz", "flx"]
         )
+        _tune_http_session(new_exchange)
 
         # Test the connection by making a simple API call
         test = new_info.post("/info", {"type": "l2Book", "coin": "@260"})
@@ -233,6 +348,7 @@ def reinitialize_connections():
         # If we got here, connections are good - update globals
         info = new_info
         exchange = new_exchange
+        BUILDER = get_builder()  # Refresh cached builder config
 
         print(f"   ✓ Connections reinitialized and tested")
         return True
@@ -274,7 +390,7 @@ def get_anchor_price():
         return cached_anchor
 
     # Check if we should use perp oracle price instead of perp book
-    use_oracle_price = CONFIG['exchange'].get('use_perp_oracle_price', False)
+    use_oracle_price = USE_PERP_ORACLE_PRICE
 
     try:
         # Fetch perp oracle price if enabled
@@ -414,14 +530,16 @@ def get_position_info():
     try:
         # For spot markets, balances are in user_state.balances, NOT assetPositions
         # assetPositions is for perps only
-        print(f"   [BALANCE DEBUG] Querying user_state for: {account_address[:10]}...")
+        if DEBUG:
+            print(f"   [BALANCE DEBUG] Querying user_state for: {account_address[:10]}...")
         user_state = info.user_state(account_address)
 
         # balances format: [{coin: "404", hold: "0.0", total: "0.39"}]
         # coin "404" = XMR1 token ID
         # coin "0" = USDC token ID
         balances = user_state.get("balances", [])
-        print(f"   [BALANCE DEBUG] Raw balances: {balances}")
+        if DEBUG:
+            print(f"   [BALANCE DEBUG] Raw balances: {balances}")
 
         base_balance = 0.0
         usdc_balance = 0.0
@@ -434,7 +552,8 @@ def get_position_info():
             # Available = total - hold
             available = float(total) - float(hold)
 
-            print(f"   [BALANCE DEBUG] Coin {coin_id}: total={total}, hold={hold}, available={available}")
+            if DEBUG:
+                print(f"   [BALANCE DEBUG] Coin {coin_id}: total={total}, hold={hold}, available={available}")
 
             # Map coin IDs to tokens
             # Note: Coin IDs vary by token:
@@ -455,12 +574,12 @@ def get_position_info():
 
         # For spot: "position" = base token balance
         # We don't track entry price for spot (no leverage, just holdings)
-        print(f"   [BALANCE DEBUG] Final balances: {BASE_TOKEN}={base_balance}, {QUOTE_TOKEN}={usdc_balance}")
+        if DEBUG:
+            print(f"   [BALANCE DEBUG] Final balances: {BASE_TOKEN}={base_balance}, {QUOTE_TOKEN}={usdc_balance}")
         return base_balance, None
 
     except Exception as e:
         print(f"   ⚠️  Error getting balances: {e}")
-        import traceback
         traceback.print_exc()
         return 0.0, None
 
@@ -513,7 +632,13 @@ def get_spot_orderbook():
         return None
 
 def cancel_all_orders():
-    """Cancel all open orders for this spot market"""
+    """Cancel all open orders for this spot market
+
+    Returns: (num_cancelled, released) where released maps BASE_TOKEN /
+    QUOTE_TOKEN to the hold amounts freed by the cancellations, so callers
+    can update balances locally instead of re-querying the exchange.
+    """
+    released = {BASE_TOKEN: 0.0, QUOTE_TOKEN: 0.0}
     try:
         # Spot orders don't use dex parameter
         open_orders = info.open_orders(account_address)
@@ -522,96 +647,164 @@ def cancel_all_orders():
 
         if spot_orders:
             print(f"   Cancelling {len(spot_orders)} existing orders...")
-            for order in spot_orders:
-                try:
-                    # Use the coin format from the order itself for cancellation
-                    cancel_result = exchange.cancel(order["coin"], order["oid"])
-                except Exception as e:
-                    print(f"   ⚠️  Error canceling order {order['oid']}: {e}")
+            # One batched RPC cancels all orders instead of a round-trip each
+            # (use the coin format from the order itself for cancellation)
+            cancel_requests = [{"coin": o["coin"], "oid": o["oid"]} for o in spot_orders]
+            try:
+                cancel_result = exchange.bulk_cancel(cancel_requests)
+                statuses = cancel_result.get("response", {}).get("data", {}).get("statuses", [])
+                for order, status in zip(spot_orders, statuses):
+                    if status != "success":
+                        print(f"   ⚠️  Error canceling order {order['oid']}: {status}")
+                        continue
+                    # Buys hold quote (size * price), sells hold base (size)
+                    size = float(order.get("sz", 0))
+                    if order.get("side") == "B":
+                        released[QUOTE_TOKEN] += size * float(order.get("limitPx", 0))
+                    else:
+                        released[BASE_TOKEN] += size
+            except Exception as e:
+                print(f"   ⚠️  Error canceling orders: {e}")
 
             # IMPORTANT: Wait longer for cancellations to fully process
             # Exchange needs time to release "hold" funds before new orders
             time.sleep(1.5)  # Empirically measured: max 1.142s + 0.36s safety margin
-            return len(spot_orders)
-        return 0
+            return len(spot_orders), released
+        return 0, released
     except Exception as e:
         print(f"   ⚠️  Error cancelling orders: {e}")
-        return 0
+        return 0, released
 
-def place_quote(is_buy, price, size):
-    """Place a spot limit order (maker-only)
+def _order_request(is_buy, price, size):
+    """Build a single order request dict for bulk submission.
+
+    Spot orders use SPOT_COIN_ORDER which is pair format for core assets
+    (e.g., "PURR/USDC") or @index format for builder assets (e.g., "@404").
+    Post-only (ALO = Add Liquidity Only) to ensure maker rebates.
+    """
+    return {
+        "coin": SPOT_COIN_ORDER,
+        "is_buy": is_buy,
+        "sz": size,
+        "limit_px": price,
+        "order_type": {"limit": {"tif": "Alo"}},
+        "reduce_only": False,
+    }
+
+def _parse_order_status(status, side_label):
+    """Parse a single per-order status from an exchange response
 
     Returns: (success: bool, order_id: str or None)
     """
+    if "resting" in status:
+        # Extract order ID from resting status
+        return True, status.get("resting", {}).get("oid")
+    elif "error" in status:
+        error_msg = status.get("error", "Unknown error")
+        print(f"      ❌ {side_label} order error: {error_msg}")
+        return False, None
+    else:
+        # Status OK but no resting or error - unexpected state
+        print(f"      ⚠️  {side_label} order response unexpected: {status}")
+        return False, None
+
+def _submit_orders(orders):
+    """Submit one or more orders in a single signed bulk_orders request
+
+    Returns: list of (success, order_id) tuples aligned with the input orders
+    """
     global rate_limit_hit
 
+    result = exchange.bulk_orders(orders, builder=BUILDER)
+
+    # Check if the batch was accepted
+    if result.get("status") == "ok":
+        statuses = result.get("response", {}).get("data", {}).get("statuses", [])
+        results = []
+        for i, order in enumerate(orders):
+            status = statuses[i] if i < len(statuses) else {}
+            side_label = "Buy" if order["is_buy"] else "Sell"
+            results.append(_parse_order_status(status, side_label))
+        return results
+    else:
+        # Status not OK - log full response
+        response_text = str(result.get('response', ''))
+        print(f"      ❌ Order failed: {result.get('status', 'unknown status')}")
+        print(f"         Full response: {result}")
+
+        # Check for rate limit error
+        if 'Too many cumulative requests' in response_text or 'cumulative volume traded' in response_text:
+            print(f"\n{'='*80}")
+            print(f"🛑 RATE LIMIT DETECTED - STOPPING BOT")
+            print(f"{'='*80}")
+            print(f"Hyperliquid has blocked further orders due to insufficient trading volume.")
+            print(f"To resume trading, you must place taker orders to build volume:")
+            print(f"  • Every $1 traded = 1 more request allowed")
+            print(f"  • You likely need $2000-3000 in volume to unlock enough quota")
+            print(f"\nBot will now stop to avoid wasting remaining quota.")
+            print(f"{'='*80}\n")
+            rate_limit_hit = True
+
+        return [(False, None)] * len(orders)
+
+def place_quote(is_buy, price, size):
+    """Place a spot limit order (maker-only)
+
+    Returns: (success: bool, order_id: str or None)
+    """
     try:
         # Round price to configured decimal places (varies by asset)
         price = round(price, PRICE_DECIMALS)
 
         # Round size to valid increment
-        size = round(size / SIZE_INCREMENT) * SIZE_INCREMENT
+        size = round(size * SIZE_INCREMENT_INV) * SIZE_INCREMENT
 
         # Enforce minimum size
         if size < MIN_ORDER_SIZE:
             return False, None
 
-        # Use post-only orders to ensure maker rebates (ALO = Add Liquidity Only)
-        order_type = {"limit": {"tif": "Alo"}}
-
-        # Spot orders use standard order() call without dex specification
-        # Use SPOT_COIN_ORDER which is pair format for core assets (e.g., "PURR/USDC")
-        # or @index format for builder assets (e.g., "@404")
-        result = exchange.order(
-            SPOT_COIN_ORDER,  # coin (pair format for core, @index for builder)
-            is_buy,           # is_buy
-            size,             # sz
-            price,            # limit_px
-            order_type,       # order_type
-            False,            # reduce_only
-            builder=get_builder()
-        )
-
-        # Check if order was successful
-        if result.get("status") == "ok":
-            statuses = result.get("response", {}).get("data", {}).get("statuses", [])
-            if statuses and "resting" in statuses[0]:
-                # Extract order ID from resting status
-                resting_info = statuses[0].get("resting", {})
-                oid = resting_info.get("oid")
-                return True, oid
-            elif statuses and "error" in statuses[0]:
-                error_msg = statuses[0].get("error", "Unknown error")
-                print(f"      ❌ Order error: {error_msg}")
-                return False, None
-            else:
-                # Status OK but no resting or error - unexpected state
-                print(f"      ⚠️  Order response unexpected: {statuses}")
-                return False, None
-        else:
-            # Status not OK - log full response
-            response_text = str(result.get('response', ''))
-            print(f"      ❌ Order failed: {result.get('status', 'unknown status')}")
-            print(f"         Full response: {result}")
-
-            # Check for rate limit error
-            if 'Too many cumulative requests' in response_text or 'cumulative volume traded' in response_text:
-                print(f"\n{'='*80}")
-                print(f"🛑 RATE LIMIT DETECTED - STOPPING BOT")
-                print(f"{'='*80}")
-                print(f"Hyperliquid has blocked further orders due to insufficient trading volume.")
-                print(f"To resume trading, you must place taker orders to build volume:")
-                print(f"  • Every $1 traded = 1 more request allowed")
-                print(f"  • You likely need $2000-3000 in volume to unlock enough quota")
-                print(f"\nBot will now stop to avoid wasting remaining quota.")
-                print(f"{'='*80}\n")
-                rate_limit_hit = True
-
-            return False, None
+        return _submit_orders([_order_request(is_buy, price, size)])[0]
     except Exception as e:
         print(f"   ⚠️  Error placing {'buy' if is_buy else 'sell'} order: {e}")
         return False, None
 
+def place_quotes(bid_price, bid_size, ask_price, ask_size):
+    """Place bid + ask as a single bulk order payload
+
+    One signed request instead of two - halves order-placement latency
+    and signing overhead each cycle.
+
+    Returns: (bid_ok: bool, bid_oid, ask_ok: bool, ask_oid)
+    """
+    try:
+        # Round prices to configured decimal places (varies by asset)
+        bid_price = round(bid_price, PRICE_DECIMALS)
+        ask_price = round(ask_price, PRICE_DECIMALS)
+
+        # Round sizes to valid increment
+        bid_size = round(bid_size * SIZE_INCREMENT_INV) * SIZE_INCREMENT
+        ask_size = round(ask_size * SIZE_INCREMENT_INV) * SIZE_INCREMENT
+
+        # If one side is below minimum, fall back to single-side placement
+        if bid_size < MIN_ORDER_SIZE and ask_size < MIN_ORDER_SIZE:
+            return False, None, False, None
+        if bid_size < MIN_ORDER_SIZE:
+            ask_ok, ask_oid = place_quote(is_buy=False, price=ask_price, size=ask_size)
+            return False, None, ask_ok, ask_oid
+        if ask_size < MIN_ORDER_SIZE:
+            bid_ok, bid_oid = place_quote(is_buy=True, price=bid_price, size=bid_size)
+            return bid_ok, bid_oid, False, None
+
+        results = _submit_orders([
+            _order_request(True, bid_price, bid_size),
+            _order_request(False, ask_price, ask_size),
+        ])
+        (bid_ok, bid_oid), (ask_ok, ask_oid) = results
+        return bid_ok, bid_oid, ask_ok, ask_oid
+    except Exception as e:
+        print(f"   ⚠️  Error placing bulk quotes: {e}")
+        return False, None, False, None
+
 # ============================================================
 # SMART ORDER MANAGEMENT
 # ============================================================
@@ -652,8 +845,11 @@ def should_update_quotes(current_spot_mid, position):
         return True, "first_run"
 
     # Check if spot mid moved significantly (PRIMARY pricing trigger)
-    mid_change_bps = abs(current_spot_mid - last_spot_mid) / last_spot_mid * 10000
-    if mid_change_bps > 3:  # 3 bps threshold (tightened from 5 to cancel faster on market moves)
+    # Compare the raw delta against an absolute threshold so the common
+    # "no move" path skips the division - only compute bps when triggering
+    mid_delta = abs(current_spot_mid - last_spot_mid)
+    if mid_delta > last_spot_mid * 3e-4:  # 3 bps threshold (tightened from 5 to cancel faster on market moves)
+        mid_change_bps = mid_delta / last_spot_mid * 10000
         return True, f"spot_mid_moved_{mid_change_bps:.1f}bps"
 
     # Check if inventory changed (we got filled)
@@ -792,11 +988,25 @@ def record_fills_to_db(fills_list):
 
         for fill in fills_list:
             try:
+                # Skip fills we've already recorded this session
+                key = (fill.get('oid'), fill.get('time'))
+                if key in _seen_fill_keys:
+                    continue
+                if len(_seen_fill_order) == _seen_fill_order.maxlen:
+                    # Ring is full - evict the oldest key from the set too
+                    _seen_fill_keys.discard(_seen_fill_order.popleft())
+                _seen_fill_order.append(key)
+                _seen_fill_keys.add(key)
+
                 # Parse fill data
                 timestamp_ms = int(fill.get('time', 0))
-                timestamp_dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
-                # Format with space separator to match metrics_1min table
-                timestamp = timestamp_dt.strftime('%Y-%m-%d %H:%M:%S.%f+00:00')
+                dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+                # Format directly instead of strftime (~10x faster per fill)
+                # Space separator matches metrics_1min table
+                timestamp = (
+                    f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+                    f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.{dt.microsecond:06d}+00:00"
+                )
 
                 side = fill.get('side', '').lower()  # 'A' = ask/sell, 'B' = bid/buy
                 if side == 'a':
@@ -854,7 +1064,6 @@ def record_fills_to_db(fills_list):
 
     except Exception as e:
         print(f"   ⚠️  Error recording fills to database: {e}")
-        import traceback
         traceback.print_exc()
         return 0
 
@@ -881,26 +1090,25 @@ def check_and_record_fills():
     last_fill_api_call = current_time
 
     try:
-        # Get fills from Hyperliquid
-        all_fills = info.user_fills(account_address)
-
-        # Filter for this spot market's fills only
-        # Check both formats since core assets return fills in pair format (e.g., "PURR/USDC")
-        spot_fills = [f for f in all_fills if f.get('coin') in [SPOT_COIN, SPOT_COIN_ORDER, PAIR_NAME]]
-
-        # Debug: Show total fills found
-        if spot_fills and last_fill_check_time is None:
-            print(f"   [FILLS DEBUG] Found {len(spot_fills)} total {BASE_TOKEN} fills in history")
-
-        # Only check fills from last 5 minutes to avoid duplicates
+        # Window the query server-side with userFillsByTime - the response
+        # scales with the lookback window instead of the full account history
         if last_fill_check_time is None:
             # First run - get last 5 minutes
-            cutoff_time = int((datetime.now(timezone.utc).timestamp() - 300) * 1000)
-            print(f"   [FILLS DEBUG] First run - checking fills since {datetime.fromtimestamp(cutoff_time/1000, tz=timezone.utc)}")
+            start_time = int((datetime.now(timezone.utc).timestamp() - 300) * 1000)
+            if DEBUG:
+                print(f"   [FILLS DEBUG] First run - checking fills since {datetime.fromtimestamp(start_time/1000, tz=timezone.utc)}")
         else:
-            cutoff_time = last_fill_check_time
+            start_time = last_fill_check_time + 1
+
+        all_fills = info.post("/info", {
+            "type": "userFillsByTime",
+            "user": account_address,
+            "startTime": start_time
+        })
 
-        recent_fills = [f for f in spot_fills if int(f.get('time', 0)) > cutoff_time]
+        # Filter for this spot market's fills only
+        # Check both formats since core assets return fills in pair format (e.g., "PURR/USDC")
+        recent_fills = [f for f in all_fills if f.get('coin') in [SPOT_COIN, SPOT_COIN_ORDER, PAIR_NAME]]
 
         # Update last check time to most recent fill
         if recent_fills:
@@ -911,7 +1119,6 @@ def check_and_record_fills():
 
     except Exception as e:
         print(f"   ⚠️  Error checking fills: {e}")
-        import traceback
         traceback.print_exc()
         return 0
 
@@ -919,39 +1126,77 @@ def check_and_record_fills():
 # VOLATILITY CIRCUIT BREAKER
 # ============================================================
 
-def update_price_history(current_price):
+def update_price_history(current_price, now):
     """Track price history for volatility monitoring"""
-    global price_history
-
-    now = time.time()
-    price_history.append((now, current_price))
-
-    # Keep only last 15 minutes of data
-    cutoff_time = now - (15 * 60)
-    price_history = [(t, p) for t, p in price_history if t > cutoff_time]
+    price_ts.append(now)
+    price_px.append(current_price)
+
+    # Maintain monotonic deques incrementally: pop entries from the back that
+    # the new price dominates, then append.  Amortized O(1) per sample.
+    for dq in (min_dq_10, min_dq_15):
+        while dq and dq[-1][1] >= current_price:
+            dq.pop()
+        dq.append((now, current_price))
+    for dq in (max_dq_10, max_dq_15):
+        while dq and dq[-1][1] <= current_price:
+            dq.pop()
+        dq.append((now, current_price))
+
+    # Keep only last 15 minutes of data - timestamps are sorted, so locate
+    # the cutoff in O(log n) and delete the expired leading slice
+    cutoff_time = now - FIFTEEN_MIN_SEC
+    k = bisect_right(price_ts, cutoff_time)
+    if k:
+        del price_ts[:k]
+        del price_px[:k]
+
+def get_window_stats(window_sec, now):
+    """O(1) rolling (min, max) over the trailing window via monotonic deques"""
+    if window_sec <= 600:
+        min_dq, max_dq = min_dq_10, max_dq_10
+    else:
+        min_dq, max_dq = min_dq_15, max_dq_15
+    cutoff = now - window_sec
+    while min_dq and min_dq[0][0] <= cutoff:
+        min_dq.popleft()
+    while max_dq and max_dq[0][0] <= cutoff:
+        max_dq.popleft()
+    if not min_dq or not max_dq:
+        return None, None
+    return min_dq[0][1], max_dq[0][1]
+
+def record_paused_price(now):
+    """Feed price history from the cached WS mid while the breaker is paused
+
+    While paused we skip all network fetches, so keep the volatility windows
+    fresh from the zero-RTT websocket orderbook cache; without this the
+    15-minute calm window would have no samples to resume on.
+    """
+    if ws_client:
+        ob = ws_client.get_orderbook()
+        if ob and ob.get('mid'):
+            update_price_history(ob['mid'], now)
 
-def check_volatility():
+def check_volatility(now):
     """
     Check if market volatility exceeds safety thresholds
 
     Returns: (should_pause, volatility_pct, time_window)
     """
-    global price_history, circuit_breaker_active, circuit_breaker_activated_at
+    global circuit_breaker_active, circuit_breaker_activated_at
 
-    if len(price_history) < 2:
+    if len(price_ts) < 2:
         return False, 0, 0
 
-    now = time.time()
+    # Rolling min/max come from the monotonic deques maintained in
+    # update_price_history - O(1) per query regardless of window size
+    min_10, max_10 = get_window_stats(TEN_MIN_SEC, now)
+    min_15, max_15 = get_window_stats(FIFTEEN_MIN_SEC, now)
 
     # Check 10-minute volatility (pause threshold)
-    ten_min_ago = now - (10 * 60)
-    recent_prices = [(t, p) for t, p in price_history if t > ten_min_ago]
-
-    if len(recent_prices) >= 2:
-        prices = [p for _, p in recent_prices]
-        min_price = min(prices)
-        max_price = max(prices)
-        volatility_10min = ((max_price - min_price) / min_price) * 100
+    if min_10 is not None:
+        # Single division: fold the /min and *100 into one reciprocal
+        volatility_10min = (max_10 - min_10) * (100.0 / min_10)
 
         # PAUSE if volatility > 5% in 10 minutes
         if volatility_10min > 5.0:
@@ -971,14 +1216,8 @@ def check_volatility():
     # Check if we should RESUME (only if currently paused)
     if circuit_breaker_active:
         # Need 15 minutes of calm (< 2% moves) to resume
-        fifteen_min_ago = now - (15 * 60)
-        calm_period_prices = [(t, p) for t, p in price_history if t > fifteen_min_ago]
-
-        if len(calm_period_prices) >= 2:
-            prices = [p for _, p in calm_period_prices]
-            min_price = min(prices)
-            max_price = max(prices)
-            volatility_15min = ((max_price - min_price) / min_price) * 100
+        if min_15 is not None:
+            volatility_15min = (max_15 - min_15) * (100.0 / min_15)
 
             # RESUME if volatility < 2% over 15 minutes
             if volatility_15min < 2.0:
@@ -1000,51 +1239,151 @@ def check_volatility():
 # MARKET MAKING LOGIC
 # ============================================================
 
+BALANCE_WS_MAX_AGE = 30       # Max age (s) of a webData2 push we trust
+BALANCE_RECONCILE_SECONDS = 60  # Force a REST fetch at least this often
+_last_balance_rest_fetch = 0.0
+
+def fetch_balances():
+    """Fetch spot balances, preferring the webData2 WebSocket cache
+
+    The exchange pushes account state over webData2, so most cycles read
+    balances from the in-memory cache with zero RTT; a REST fetch still runs
+    periodically as a reconciliation safety net (and whenever the cache is
+    missing or stale).
+
+    Returns: dict with xmr_balance / xmr_total / usdc_balance, or None if
+    the fetch failed (caller should skip the cycle).
+    """
+    global _last_balance_rest_fetch
+
+    if ws_client:
+        cached = ws_client.get_spot_balances()
+        if (cached and cached['age'] < BALANCE_WS_MAX_AGE and
+                _now() - _last_balance_rest_fetch < BALANCE_RECONCILE_SECONDS):
+            bals = cached['balances']
+            xmr_entry = bals.get(BASE_TOKEN, {"total": "0", "hold": "0"})
+            xmr_total = float(xmr_entry["total"])
+            usdc_entry = bals.get(QUOTE_TOKEN, {"total": "0", "hold": "0"})
+            return {
+                'xmr_balance': xmr_total - float(xmr_entry["hold"]),
+                'xmr_total': xmr_total,
+                'usdc_balance': float(usdc_entry["total"]) - float(usdc_entry["hold"]),
+            }
+
+    # Get balances from spotClearinghouseState (correct endpoint for spot balances)
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            spot_state = info.post("/info", {
+                "type": "spotClearinghouseState",
+                "user": account_address
+            })
+            balances = spot_state.get("balances", [])
+
+            # Index by coin once, then look up the two tokens directly
+            bals = {b["coin"]: b for b in balances}  # "USDC", "XMR1", etc.
+
+            xmr_entry = bals.get(BASE_TOKEN, {"total": "0", "hold": "0"})
+            xmr_total = float(xmr_entry["total"])  # Total including holds
+            xmr_balance = xmr_total - float(xmr_entry["hold"])
+
+            usdc_entry = bals.get(QUOTE_TOKEN, {"total": "0", "hold": "0"})
+            usdc_balance = float(usdc_entry["total"]) - float(usdc_entry["hold"])
+
+            _last_balance_rest_fetch = _now()
+            return {
+                'xmr_balance': xmr_balance,
+                'xmr_total': xmr_total,
+                'usdc_balance': usdc_balance,
+            }
+
+        except Exception as e:
+            error_str = str(e)
+            if '429' in error_str:  # Rate limit error
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * 2  # 2s, 4s, 6s
+                    print(f"   ⚠️  Rate limited (429) - waiting {wait_time}s before retry {attempt + 2}/{max_retries}")
+                    time.sleep(wait_time)
+                    continue
+                else:
+                    print(f"   ⚠️  Rate limited after {max_retries} attempts - skipping this cycle")
+                    return None
+            else:
+                print(f"   ⚠️  Error getting balances: {e}")
+                traceback.print_exc()
+                return None
+    return None
+
 def update_quotes():
     """Smart quote management - updates only when needed, based on spot market"""
+    try:
+        _update_quotes()
+    finally:
+        # One buffered stdout write per cycle instead of ~40 print syscalls
+        _flush_log()
+
+def _update_quotes():
+    """update_quotes body - log lines go through _log and are flushed by the wrapper"""
     global emergency_stop, consecutive_connection_failures
     global last_spot_mid, last_inventory
     global current_bid_oid, current_ask_oid, current_bid_price, current_ask_price
-    global current_bid_size, current_ask_size
+    global current_bid_size, current_ask_size, _last_quote_sig
+
+    # Bind hot module globals to locals once: every later access is a
+    # LOAD_FAST instead of a LOAD_GLOBAL dict lookup in this long function
+    log = _log
+    price_spec = PRICE_SPEC
+    base_token = BASE_TOKEN
+    quote_token = QUOTE_TOKEN
 
     # Emergency stop check
     if emergency_stop:
-        print("\n🚨 EMERGENCY STOP ACTIVE - Not quoting")
-        print("   Restart bot to resume")
+        log("\n🚨 EMERGENCY STOP ACTIVE - Not quoting")
+        log("   Restart bot to resume")
         return
 
-    print(f"\n{'='*80}")
-    print(f"Market Update - {time.strftime('%H:%M:%S')}")
-    print(f"{'='*80}")
+    # One timestamp per cycle - reused by price history and volatility checks
+    # (monotonic: used only for interval math, never logged)
+    now = _now()
+
+    log(f"\n{'='*80}")
+    log(f"Market Update - {time.strftime('%H:%M:%S')}")
+    log(f"{'='*80}")
+
+    # Steps 1-3 are independent network round-trips - issue them concurrently
+    # so the cycle costs ~1 RTT instead of 3 serialized ones
+    f_anchor = _fetch_executor.submit(get_anchor_price)
+    f_bal = _fetch_executor.submit(fetch_balances)
+    f_ob = _fetch_executor.submit(get_spot_orderbook)
 
     # Step 1: Get anchor price from perp
     if PERP_COIN:
-        use_oracle = CONFIG['exchange'].get('use_perp_oracle_price', False)
-        if use_oracle:
-            print(f"1. Fetching oracle price for {PERP_COIN} perp...")
+        if USE_PERP_ORACLE_PRICE:
+            log(f"1. Fetching oracle price for {PERP_COIN} perp...")
         else:
-            print(f"1. Fetching anchor price from {PERP_COIN} perp...")
+            log(f"1. Fetching anchor price from {PERP_COIN} perp...")
     else:
-        print("1. No perp oracle configured (using spot mid only)...")
-    anchor = get_anchor_price()
+        log("1. No perp oracle configured (using spot mid only)...")
+    anchor = f_anchor.result(timeout=30)
 
     if not anchor:
         consecutive_connection_failures += 1
-        print(f"   ❌ Cannot get valid anchor price - SKIPPING THIS CYCLE")
-        print(f"   (Safety: Do not quote without reliable oracle)")
-        print(f"   Consecutive failures: {consecutive_connection_failures}")
+        log(f"   ❌ Cannot get valid anchor price - SKIPPING THIS CYCLE")
+        log(f"   (Safety: Do not quote without reliable oracle)")
+        log(f"   Consecutive failures: {consecutive_connection_failures}")
 
         # After 3 consecutive failures, try to reconnect
         if consecutive_connection_failures >= 3:
-            print(f"\n   ⚠️  {consecutive_connection_failures} consecutive failures detected")
-            print(f"   Possible cause: Computer sleep, VPN disconnect, or network issue")
-            print(f"   Attempting to reconnect...")
+            log(f"\n   ⚠️  {consecutive_connection_failures} consecutive failures detected")
+            log(f"   Possible cause: Computer sleep, VPN disconnect, or network issue")
+            log(f"   Attempting to reconnect...")
+            _flush_log()
 
             if reinitialize_connections():
                 consecutive_connection_failures = 0  # Reset counter
-                print(f"   ✓ Reconnection successful - will retry next cycle")
+                log(f"   ✓ Reconnection successful - will retry next cycle")
             else:
-                print(f"   ❌ Reconnection failed - will retry in 30s")
+                log(f"   ❌ Reconnection failed - will retry in 30s")
 
         return
 
@@ -1053,89 +1392,47 @@ def update_quotes():
 
     anchor_price = anchor["price"]
     source = anchor.get("source", "Unknown")
-    print(f"   ✓ Anchor: ${anchor_price:.{PRICE_DECIMALS}f} ({source})")
-    print(f"      Perp bid/ask: ${anchor['bid']:.{PRICE_DECIMALS}f} / ${anchor['ask']:.{PRICE_DECIMALS}f}")
-    print(f"      Perp spread: {anchor['spread_bps']:.1f} bps")
-
-    # Small delay to avoid rate limiting
-    time.sleep(0.5)
-
-    # Step 2: Get current spot balances
-    print("\n2. Checking balances...")
-
-    # Get balances from spotClearinghouseState (correct endpoint for spot balances)
-    # Retry with backoff on rate limit errors
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            spot_state = info.post("/info", {
-                "type": "spotClearinghouseState",
-                "user": account_address
-            })
-            balances = spot_state.get("balances", [])
-
-            xmr_balance = 0.0
-            usdc_balance = 0.0
-
-            xmr_total = 0.0
-            for balance_entry in balances:
-                coin_name = balance_entry.get("coin")  # "USDC", "XMR1", etc.
-                total = balance_entry.get("total", "0")
-                hold = balance_entry.get("hold", "0")
-                available = float(total) - float(hold)
+    log(f"   ✓ Anchor: ${format(anchor_price, price_spec)} ({source})")
+    log(f"      Perp bid/ask: ${format(anchor['bid'], price_spec)} / ${format(anchor['ask'], price_spec)}")
+    log(f"      Perp spread: {anchor['spread_bps']:.1f} bps")
 
-                if coin_name == BASE_TOKEN:
-                    xmr_balance = available
-                    xmr_total = float(total)  # Total including holds
-                elif coin_name == QUOTE_TOKEN:
-                    usdc_balance = available
+    # Step 2: Get current spot balances (fetched concurrently above)
+    log("\n2. Checking balances...")
 
-            position = xmr_balance  # For order placement checks (available only)
-            position_total = xmr_total  # For inventory change detection (total including holds)
-            break  # Success, exit retry loop
+    bal = f_bal.result(timeout=30)
+    if bal is None:
+        return  # fetch_balances already printed the reason
 
-        except Exception as e:
-            error_str = str(e)
-            if '429' in error_str:  # Rate limit error
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2  # 2s, 4s, 6s
-                    print(f"   ⚠️  Rate limited (429) - waiting {wait_time}s before retry {attempt + 2}/{max_retries}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    print(f"   ⚠️  Rate limited after {max_retries} attempts - skipping this cycle")
-                    return
-            else:
-                print(f"   ⚠️  Error getting balances: {e}")
-                import traceback
-                traceback.print_exc()
-                return
+    xmr_balance = bal['xmr_balance']
+    usdc_balance = bal['usdc_balance']
+    position = bal['xmr_balance']  # For order placement checks (available only)
+    position_total = bal['xmr_total']  # For inventory change detection (total including holds)
 
     entry_price = None  # No entry price tracking for spot
 
-    print(f"   {BASE_TOKEN} balance: {xmr_balance:.4f} (Target: {TARGET_POSITION:.2f})")
-    print(f"   {QUOTE_TOKEN} balance: ${usdc_balance:.2f}")
+    log(f"   {base_token} balance: {xmr_balance:.4f} (Target: {TARGET_POSITION:.2f})")
+    log(f"   {quote_token} balance: ${usdc_balance:.2f}")
 
-    # Step 3: Get spot orderbook
-    print("\n3. Fetching spot orderbook...")
-    spot_ob = get_spot_orderbook()
+    # Step 3: Get spot orderbook (fetched concurrently above)
+    log("\n3. Fetching spot orderbook...")
+    spot_ob = f_ob.result(timeout=30)
 
     if not spot_ob:
-        print("   ❌ Cannot get spot orderbook - SKIPPING THIS CYCLE")
+        log("   ❌ Cannot get spot orderbook - SKIPPING THIS CYCLE")
         return
 
-    print(f"   Spot mid: ${spot_ob['mid']:.{PRICE_DECIMALS}f}")
-    print(f"   Spot bid/ask: ${spot_ob['best_bid']:.{PRICE_DECIMALS}f} / ${spot_ob['best_ask']:.{PRICE_DECIMALS}f}")
-    print(f"   Spot spread: {spot_ob['spread_bps']:.1f} bps")
-    print(f"   Depth (top 5): {spot_ob['bid_depth']:.2f} / {spot_ob['ask_depth']:.2f} {BASE_TOKEN}")
+    log(f"   Spot mid: ${format(spot_ob['mid'], price_spec)}")
+    log(f"   Spot bid/ask: ${format(spot_ob['best_bid'], price_spec)} / ${format(spot_ob['best_ask'], price_spec)}")
+    log(f"   Spot spread: {spot_ob['spread_bps']:.1f} bps")
+    log(f"   Depth (top 5): {spot_ob['bid_depth']:.2f} / {spot_ob['ask_depth']:.2f} {base_token}")
 
     # Step 3.5: Smart check - do we need to update?
-    print("\n3.5. Checking if update needed...")
+    log("\n3.5. Checking if update needed...")
 
     spot_mid = spot_ob['mid']
 
     # Update price history for volatility monitoring
-    update_price_history(spot_mid)
+    update_price_history(spot_mid, now)
 
     needs_update, reason = should_update_quotes(spot_mid, position_total)
 
@@ -1143,7 +1440,7 @@ def update_quotes():
     global current_bid_price, current_ask_price
 
     if not needs_update:
-        print(f"   ✓ No update needed ({reason})")
+        log(f"   ✓ No update needed ({reason})")
 
         # Verify orders are still live
         current_orders = get_current_orders()
@@ -1152,7 +1449,7 @@ def update_quotes():
         ask_live = current_orders['ask'] is not None
 
         if bid_live and ask_live:
-            print(f"   ✓ Both sides live - quotes stable")
+            log(f"   ✓ Both sides live - quotes stable")
             last_spot_mid = spot_mid
             last_inventory = position_total
             return
@@ -1164,63 +1461,66 @@ def update_quotes():
 
             # Only force update if a side is missing that SHOULD be there
             if (not bid_live and bid_possible) or (not ask_live and ask_possible):
-                print(f"   ⚠️  Expected order missing - will update")
+                log(f"   ⚠️  Expected order missing - will update")
                 needs_update = True
                 reason = "one_side_missing"
             else:
                 # One-sided market is expected (insufficient balance for other side)
-                print(f"   ✓ One-sided market expected (insufficient balance) - quotes stable")
+                log(f"   ✓ One-sided market expected (insufficient balance) - quotes stable")
                 last_spot_mid = spot_mid
                 last_inventory = position_total
                 return
         else:
-            print(f"   ⚠️  No orders live - forcing update")
+            log(f"   ⚠️  No orders live - forcing update")
             needs_update = True
             reason = "no_orders_live"
 
-    print(f"   🔄 Update needed: {reason}")
+    log(f"   🔄 Update needed: {reason}")
 
     # Step 4: Calculate quoting mid with inventory skew
-    print("\n4. Calculating quoting mid with inventory skew...")
+    log("\n4. Calculating quoting mid with inventory skew...")
 
     # PRIMARY: Use SPOT mid (where actual trading is happening)
     base_mid = spot_ob['mid']
 
     # SECONDARY: Check deviation from perp oracle
-    spot_vs_perp_diff_pct = ((base_mid - anchor_price) / anchor_price) * 100
+    # One reciprocal and one abs, reused by the checks below
+    inv_anchor = 1.0 / anchor_price
+    spot_vs_perp_diff_pct = (base_mid - anchor_price) * inv_anchor * 100
     spot_vs_perp_diff_bps = spot_vs_perp_diff_pct * 100
+    abs_dev_pct = abs(spot_vs_perp_diff_pct)
 
-    print(f"   Spot mid: ${base_mid:.{PRICE_DECIMALS}f}")
+    log(f"   Spot mid: ${format(base_mid, price_spec)}")
     if PERP_COIN and anchor_price:
-        print(f"   Perp anchor: ${anchor_price:.{PRICE_DECIMALS}f}")
-        print(f"   Deviation: {spot_vs_perp_diff_bps:+.0f} bps ({spot_vs_perp_diff_pct:+.2f}%)")
+        log(f"   Perp anchor: ${format(anchor_price, price_spec)}")
+        log(f"   Deviation: {spot_vs_perp_diff_bps:+.0f} bps ({spot_vs_perp_diff_pct:+.2f}%)")
 
     # Circuit breaker: If spot deviates too much from perp, pause
     # Skip if deviation >100% (indicates wrong oracle/spot coin mismatch)
     MAX_SPOT_PERP_DEVIATION_PCT = 5.0  # 5% max deviation
-    if anchor_price and abs(spot_vs_perp_diff_pct) > MAX_SPOT_PERP_DEVIATION_PCT and abs(spot_vs_perp_diff_pct) < 100:
-        print(f"   🚨 CIRCUIT BREAKER: Spot deviates {spot_vs_perp_diff_pct:+.2f}% from perp!")
-        print(f"      Max allowed: ±{MAX_SPOT_PERP_DEVIATION_PCT}%")
-        print(f"      PAUSING - Market may be dislocated")
+    if anchor_price and abs_dev_pct > MAX_SPOT_PERP_DEVIATION_PCT and abs_dev_pct < 100:
+        log(f"   🚨 CIRCUIT BREAKER: Spot deviates {spot_vs_perp_diff_pct:+.2f}% from perp!")
+        log(f"      Max allowed: ±{MAX_SPOT_PERP_DEVIATION_PCT}%")
+        log(f"      PAUSING - Market may be dislocated")
         return
-    elif anchor_price and abs(spot_vs_perp_diff_pct) > 100:
-        print(f"   ⚠️  Perp oracle mismatch detected ({spot_vs_perp_diff_pct:+.0f}% deviation)")
-        print(f"   Using spot mid only (perp oracle may be wrong market)")
+    elif anchor_price and abs_dev_pct > 100:
+        log(f"   ⚠️  Perp oracle mismatch detected ({spot_vs_perp_diff_pct:+.0f}% deviation)")
+        log(f"   Using spot mid only (perp oracle may be wrong market)")
 
     # Emergency sell check: If spot drops significantly below oracle (crash protection)
-    emergency_sell_threshold = CONFIG['safety'].get('emergency_sell_if_below_oracle_pct')
-    if emergency_sell_threshold and PERP_COIN and anchor_price:
+    if EMERGENCY_SELL_THRESHOLD and PERP_COIN and anchor_price:
         # Only trigger if spot is BELOW oracle (negative deviation)
-        if spot_vs_perp_diff_pct < -emergency_sell_threshold:
-            print(f"\n{'='*80}")
-            print(f"🚨 EMERGENCY SELL TRIGGERED!")
-            print(f"{'='*80}")
-            print(f"Spot is {spot_vs_perp_diff_pct:.2f}% below oracle (threshold: -{emergency_sell_threshold}%)")
-            print(f"   Spot: ${base_mid:.{PRICE_DECIMALS}f}")
-            print(f"   Oracle: ${anchor_price:.{PRICE_DECIMALS}f}")
-            print(f"\nExecuting emergency market sell of entire position...")
+        if spot_vs_perp_diff_pct < -EMERGENCY_SELL_THRESHOLD:
+            log(f"\n{'='*80}")
+            log(f"🚨 EMERGENCY SELL TRIGGERED!")
+            log(f"{'='*80}")
+            log(f"Spot is {spot_vs_perp_diff_pct:.2f}% below oracle (threshold: -{EMERGENCY_SELL_THRESHOLD}%)")
+            log(f"   Spot: ${format(base_mid, price_spec)}")
+            log(f"   Oracle: ${format(anchor_price, price_spec)}")
+            log(f"\nExecuting emergency market sell of entire position...")
 
             # Cancel all existing orders first
+            _flush_log()
             try:
                 cancel_all_orders()
             except:
@@ -1229,22 +1529,22 @@ def update_quotes():
             # Place market sell order for entire position
             if position > MIN_ORDER_SIZE:
                 try:
-                    print(f"   Selling {position:.{SIZE_DECIMALS}f} {BASE_TOKEN} at market...")
+                    log(f"   Selling {format(position, SIZE_SPEC)} {base_token} at market...")
                     result = exchange.market_order(
                         SPOT_COIN_ORDER,
                         False,  # is_buy = False (sell)
                         position,  # Size = entire position
                         None  # No limit price (market order)
                     )
-                    print(f"   ✓ Emergency sell order placed!")
-                    print(f"   Result: {result}")
+                    log(f"   ✓ Emergency sell order placed!")
+                    log(f"   Result: {result}")
                 except Exception as e:
-                    print(f"   ❌ Emergency sell failed: {e}")
+                    log(f"   ❌ Emergency sell failed: {e}")
 
             # Stop the bot
             emergency_stop = True
-            print(f"\n🛑 Bot stopped after emergency sell")
-            print(f"{'='*80}\n")
+            log(f"\n🛑 Bot stopped after emergency sell")
+            log(f"{'='*80}\n")
             return
 
     # Apply inventory skew based on TARGET_POSITION
@@ -1265,26 +1565,26 @@ def update_quotes():
         inventory_skew_bps = -excess * INVENTORY_SKEW_BPS_PER_UNIT
 
         # Cap the skew at MAX_SKEW_BPS to prevent extreme pricing
+        # (copysign preserves the sign without branching on it)
         if abs(inventory_skew_bps) > MAX_SKEW_BPS:
-            # Preserve the sign: if negative, cap to -MAX_SKEW_BPS; if positive, cap to +MAX_SKEW_BPS
-            capped_skew = -MAX_SKEW_BPS if inventory_skew_bps < 0 else MAX_SKEW_BPS
-            print(f"   ⚠️  Skew capped: {inventory_skew_bps:+.0f} bps → {capped_skew:+.0f} bps (max: ±{MAX_SKEW_BPS} bps)")
+            capped_skew = math.copysign(MAX_SKEW_BPS, inventory_skew_bps)
+            log(f"   ⚠️  Skew capped: {inventory_skew_bps:+.0f} bps → {capped_skew:+.0f} bps (max: ±{MAX_SKEW_BPS} bps)")
             inventory_skew_bps = capped_skew
 
     skewed_mid = base_mid * (1 + inventory_skew_bps / 10000)
 
-    print(f"   Target inventory: {TARGET_POSITION:.2f} {BASE_TOKEN}")
-    print(f"   Current inventory: {position:.2f} {BASE_TOKEN}")
+    log(f"   Target inventory: {TARGET_POSITION:.2f} {base_token}")
+    log(f"   Current inventory: {position:.2f} {base_token}")
     if abs(inventory_delta) > INVENTORY_SKEW_THRESHOLD:
-        print(f"   Inventory delta: {inventory_delta:+.2f} (excess: {excess:+.2f}) → skew {inventory_skew_bps:+.0f} bps")
-        print(f"   Skewed mid: ${skewed_mid:.5f}")
+        log(f"   Inventory delta: {inventory_delta:+.2f} (excess: {excess:+.2f}) → skew {inventory_skew_bps:+.0f} bps")
+        log(f"   Skewed mid: ${skewed_mid:.5f}")
     else:
-        print(f"   Inventory delta: {inventory_delta:+.2f} (within ±{INVENTORY_SKEW_THRESHOLD} threshold - no skew)")
+        log(f"   Inventory delta: {inventory_delta:+.2f} (within ±{INVENTORY_SKEW_THRESHOLD} threshold - no skew)")
 
     quoting_mid = skewed_mid
 
     # Step 5: Calculate spreads with dynamic adjustments
-    print("\n5. Calculating spreads...")
+    log("\n5. Calculating spreads...")
 
     # Start with base spread
     spread_bps = BASE_SPREAD_BPS
@@ -1294,51 +1594,52 @@ def update_quotes():
     if PERP_COIN and anchor['spread_bps'] > 20:
         spread_adjustment = anchor['spread_bps'] / 4
         spread_bps += spread_adjustment
-        print(f"   Widening for perp volatility: +{spread_adjustment:.0f} bps")
+        log(f"   Widening for perp volatility: +{spread_adjustment:.0f} bps")
 
     # Widen spread if spot deviates from perp (risk signal)
     # Only do this if we have a perp oracle
-    if PERP_COIN and abs(spot_vs_perp_diff_pct) > 1.0:
-        deviation_spread_add = abs(spot_vs_perp_diff_bps) / 2  # Half the deviation
+    if PERP_COIN and abs_dev_pct > 1.0:
+        deviation_spread_add = abs_dev_pct * 100 / 2  # Half the deviation
         spread_bps += deviation_spread_add
-        print(f"   Widening for spot-perp deviation: +{deviation_spread_add:.0f} bps")
+        log(f"   Widening for spot-perp deviation: +{deviation_spread_add:.0f} bps")
 
     # Widen spread if spot is thin
     if spot_ob['bid_depth'] < 2.0 or spot_ob['ask_depth'] < 2.0:
         spread_bps += 20
-        print(f"   Widening for thin spot book: +20 bps")
+        log(f"   Widening for thin spot book: +20 bps")
 
     # Widen spread as position grows (inventory risk)
-    position_pct = abs(position) / MAX_POSITION_SIZE
+    position_pct = abs(position) * MAX_POSITION_SIZE_INV
     if position_pct > 0.5:
         inventory_spread_add = 30 * (position_pct - 0.5) * 2  # Up to +30 bps
         spread_bps += inventory_spread_add
-        print(f"   Widening for inventory risk: +{inventory_spread_add:.0f} bps")
+        log(f"   Widening for inventory risk: +{inventory_spread_add:.0f} bps")
 
     # Enforce limits
     spread_bps = max(MIN_SPREAD_BPS, min(MAX_SPREAD_BPS, spread_bps))
 
-    print(f"   Final spread: {spread_bps:.0f} bps")
+    log(f"   Final spread: {spread_bps:.0f} bps")
 
     # Step 6: Calculate quote prices
     half_spread_bps = spread_bps / 2
-    bid_price = quoting_mid * (1 - half_spread_bps / 10000)
-    ask_price = quoting_mid * (1 + half_spread_bps / 10000)
+    half = half_spread_bps * 1e-4
+    bid_price = quoting_mid * (1 - half)
+    ask_price = quoting_mid * (1 + half)
 
     # Display prices with appropriate precision
-    print(f"   Bid: ${bid_price:.{PRICE_DECIMALS}f}")
-    print(f"   Ask: ${ask_price:.{PRICE_DECIMALS}f}")
+    log(f"   Bid: ${format(bid_price, price_spec)}")
+    log(f"   Ask: ${format(ask_price, price_spec)}")
 
     # Step 7: Calculate order sizes
-    print("\n6. Calculating order sizes...")
+    log("\n6. Calculating order sizes...")
 
     # Base size (fixed - no dynamic sizing to avoid predictable patterns)
     bid_size = BASE_ORDER_SIZE
     ask_size = BASE_ORDER_SIZE
 
     # Round to valid increments
-    bid_size = round(bid_size / SIZE_INCREMENT) * SIZE_INCREMENT
-    ask_size = round(ask_size / SIZE_INCREMENT) * SIZE_INCREMENT
+    bid_size = round(bid_size * SIZE_INCREMENT_INV) * SIZE_INCREMENT
+    ask_size = round(ask_size * SIZE_INCREMENT_INV) * SIZE_INCREMENT
 
     # Enforce minimum
     if bid_size < MIN_ORDER_SIZE:
@@ -1346,41 +1647,50 @@ def update_quotes():
     if ask_size < MIN_ORDER_SIZE:
         ask_size = MIN_ORDER_SIZE
 
-    print(f"   Bid size: {bid_size:.2f} {BASE_TOKEN}")
-    print(f"   Ask size: {ask_size:.2f} {BASE_TOKEN}")
+    log(f"   Bid size: {bid_size:.2f} {base_token}")
+    log(f"   Ask size: {ask_size:.2f} {base_token}")
+
+    # Result-cache check: small moves can recompute to the exact same
+    # rounded quotes - if so and our orders are still live, the
+    # cancel/replace round-trips would be a no-op, so skip them
+    quote_sig = (round(bid_price, 6), round(ask_price, 6),
+                 round(bid_size, 6), round(ask_size, 6))
+    if quote_sig == _last_quote_sig and current_bid_oid and current_ask_oid:
+        log("\n7. Recomputed quotes identical to live orders - keeping them")
+        last_spot_mid = spot_mid
+        last_inventory = position_total
+        return
 
     # Step 8: Cancel existing orders
-    print("\n7. Cancelling existing orders...")
-    num_cancelled = cancel_all_orders()
+    log("\n7. Cancelling existing orders...")
+    _flush_log()
+    num_cancelled, released = cancel_all_orders()
 
-    # Step 8.5: Refresh balances after cancelling (orders release "hold" funds)
+    # Step 8.5: Credit released holds locally (cancelled orders free "hold"
+    # funds) instead of paying another network round-trip to re-query balances
     if num_cancelled > 0:
-        print(f"   Refreshing balances after cancellation...")
-        try:
-            spot_state_refresh = info.post("/info", {
-                "type": "spotClearinghouseState",
-                "user": account_address
-            })
-            balances_refresh = spot_state_refresh.get("balances", [])
+        xmr_balance += released[base_token]
+        usdc_balance += released[quote_token]
+        position = xmr_balance
+        log(f"   Updated: {base_token}={xmr_balance:.4f}, {quote_token}=${usdc_balance:.2f} (holds released locally)")
 
-            for balance_entry in balances_refresh:
-                coin_name = balance_entry.get("coin")
-                total = float(balance_entry.get("total", "0"))
-                hold = float(balance_entry.get("hold", "0"))
-                available = total - hold
-
-                if coin_name == BASE_TOKEN:
-                    xmr_balance = available
-                    position = xmr_balance
-                elif coin_name == QUOTE_TOKEN:
-                    usdc_balance = available
-
-            print(f"   Updated: {BASE_TOKEN}={xmr_balance:.4f}, {QUOTE_TOKEN}=${usdc_balance:.2f}")
-        except Exception as e:
-            print(f"   ⚠️  Could not refresh balances: {e}")
+        if DEBUG:
+            # Sanity-check the local computation against the exchange
+            try:
+                spot_state_refresh = info.post("/info", {
+                    "type": "spotClearinghouseState",
+                    "user": account_address
+                })
+                for balance_entry in spot_state_refresh.get("balances", []):
+                    coin_name = balance_entry.get("coin")
+                    if coin_name in (base_token, quote_token):
+                        available = float(balance_entry.get("total", "0")) - float(balance_entry.get("hold", "0"))
+                        log(f"   [DEBUG] Exchange {coin_name} available: {available:.4f}")
+            except Exception as e:
+                log(f"   ⚠️  Could not refresh balances: {e}")
 
     # Step 9: Place new orders (respecting position limits)
-    print("\n8. Placing new quotes...")
+    log("\n8. Placing new quotes...")
 
     bid_placed = False
     ask_placed = False
@@ -1396,68 +1706,81 @@ def update_quotes():
         usdc_balance >= usdc_needed
     )
 
+    # For ASKS: need XMR1 inventory
+    can_place_ask = position >= ask_size
+
+    _flush_log()
+
+    if can_place_bid and can_place_ask:
+        # Both sides allowed - submit as one bulk payload (single signed request)
+        bid_ok, bid_oid, ask_ok, ask_oid = place_quotes(bid_price, bid_size, ask_price, ask_size)
+    else:
+        bid_ok, bid_oid = place_quote(is_buy=True, price=bid_price, size=bid_size) if can_place_bid else (False, None)
+        ask_ok, ask_oid = place_quote(is_buy=False, price=ask_price, size=ask_size) if can_place_ask else (False, None)
+
     if can_place_bid:
-        success, oid = place_quote(is_buy=True, price=bid_price, size=bid_size)
-        if success:
-            current_bid_oid = oid
+        if bid_ok:
+            current_bid_oid = bid_oid
             current_bid_price = bid_price
             current_bid_size = bid_size
-            print(f"   ✓ Bid posted: {bid_size:.2f} @ ${bid_price:.{PRICE_DECIMALS}f}")
+            log(f"   ✓ Bid posted: {bid_size:.2f} @ ${format(bid_price, price_spec)}")
             bid_placed = True
         else:
             current_bid_oid = None
             current_bid_price = None
-            print(f"   ✗ Bid failed (see error above)")
-            print(f"      Debug: position={position:.4f}, bid_size={bid_size:.2f}, bid_price=${bid_price:.{PRICE_DECIMALS}f}, usdc_balance=${usdc_balance:.2f}")
+            log(f"   ✗ Bid failed (see error above)")
+            log(f"      Debug: position={position:.4f}, bid_size={bid_size:.2f}, bid_price=${format(bid_price, price_spec)}, usdc_balance=${usdc_balance:.2f}")
             bid_placed = False
     else:
         current_bid_oid = None
         current_bid_price = None
         bid_placed = False
         if position >= MAX_POSITION_SIZE:
-            print(f"   ⊘ Bid skipped (at max position {MAX_POSITION_SIZE})")
+            log(f"   ⊘ Bid skipped (at max position {MAX_POSITION_SIZE})")
         elif position + bid_size > MAX_POSITION_SIZE:
-            print(f"   ⊘ Bid skipped (would exceed max position of {MAX_POSITION_SIZE})")
+            log(f"   ⊘ Bid skipped (would exceed max position of {MAX_POSITION_SIZE})")
         elif usdc_balance < usdc_needed:
-            print(f"   ⊘ Bid skipped (insufficient {QUOTE_TOKEN}: have ${usdc_balance:.2f}, need ${usdc_needed:.2f})")
+            log(f"   ⊘ Bid skipped (insufficient {quote_token}: have ${usdc_balance:.2f}, need ${usdc_needed:.2f})")
 
-    # For ASKS: need XMR1 inventory
-    if position >= ask_size:
-        success, oid = place_quote(is_buy=False, price=ask_price, size=ask_size)
-        if success:
-            current_ask_oid = oid
+    if can_place_ask:
+        if ask_ok:
+            current_ask_oid = ask_oid
             current_ask_price = ask_price
             current_ask_size = ask_size
-            print(f"   ✓ Ask posted: {ask_size:.2f} @ ${ask_price:.{PRICE_DECIMALS}f}")
+            log(f"   ✓ Ask posted: {ask_size:.2f} @ ${format(ask_price, price_spec)}")
             ask_placed = True
         else:
             current_ask_oid = None
             current_ask_price = None
-            print(f"   ✗ Ask failed (see error above)")
-            print(f"      Debug: position={position:.4f}, ask_size={ask_size:.2f}, ask_price=${ask_price:.{PRICE_DECIMALS}f}")
+            log(f"   ✗ Ask failed (see error above)")
+            log(f"      Debug: position={position:.4f}, ask_size={ask_size:.2f}, ask_price=${format(ask_price, price_spec)}")
             ask_placed = False
     else:
         current_ask_oid = None
         current_ask_price = None
         ask_placed = False
-        print(f"   ⊘ Ask skipped (insufficient {BASE_TOKEN}: have {position:.4f}, need {ask_size:.2f})")
+        log(f"   ⊘ Ask skipped (insufficient {base_token}: have {position:.4f}, need {ask_size:.2f})")
+
+    # Remember the posted quote signature only when both sides are live;
+    # otherwise force a full cancel/replace next cycle
+    _last_quote_sig = quote_sig if (bid_placed and ask_placed) else None
 
     # Summary
-    print(f"\n{'='*80}")
+    log(f"\n{'='*80}")
     if bid_placed and ask_placed:
         our_spread = ask_price - bid_price
         our_spread_bps = (our_spread / quoting_mid) * 10000
-        print(f"✅ TWO-SIDED MARKET POSTED!")
-        print(f"   Spread: ${our_spread:.2f} ({our_spread_bps:.0f} bps)")
+        log(f"✅ TWO-SIDED MARKET POSTED!")
+        log(f"   Spread: ${our_spread:.2f} ({our_spread_bps:.0f} bps)")
 
         # Compare to anchor
-        anchor_to_mid_diff = ((quoting_mid - anchor_price) / anchor_price) * 10000
-        print(f"   Mid vs Anchor: {anchor_to_mid_diff:+.0f} bps")
+        anchor_to_mid_diff = (quoting_mid - anchor_price) * inv_anchor * 10000
+        log(f"   Mid vs Anchor: {anchor_to_mid_diff:+.0f} bps")
     elif bid_placed or ask_placed:
-        print(f"⚠️  ONE-SIDED MARKET (managing position)")
+        log(f"⚠️  ONE-SIDED MARKET (managing position)")
     else:
-        print(f"❌ NO QUOTES POSTED")
-    print(f"{'='*80}")
+        log(f"❌ NO QUOTES POSTED")
+    log(f"{'='*80}")
 
     # Update globals for next cycle
     last_spot_mid = spot_mid
@@ -1477,6 +1800,26 @@ def main():
 
     signal.signal(signal.SIGTERM, handle_sigterm)
 
+    # Deterministic wake-up on signals: the interpreter writes the signal
+    # number to this pipe, and a watcher thread turns it into an event-queue
+    # wake so a main thread blocked in get_event() reacts immediately instead
+    # of waiting out its timeout.
+    sig_r, sig_w = os.pipe()
+    os.set_blocking(sig_w, False)
+    signal.set_wakeup_fd(sig_w)
+
+    def _signal_watcher():
+        while True:
+            try:
+                if not os.read(sig_r, 64):
+                    break
+            except OSError:
+                break
+            if ws_client:
+                ws_client._event_q.put('signal')
+
+    threading.Thread(target=_signal_watcher, daemon=True).start()
+
     print(f"Starting {PAIR_NAME} spot market maker...\n")
     print("Safety features enabled:")
     if PERP_COIN:
@@ -1488,23 +1831,8 @@ def main():
 
     # Register current configuration and check for changes
     print("📝 Checking bot configuration...")
-    current_config = {
-        'base_order_size': BASE_ORDER_SIZE,
-        'base_spread_bps': BASE_SPREAD_BPS,
-        'update_interval_seconds': UPDATE_INTERVAL_SECONDS,
-        'update_threshold_bps': CONFIG['timing']['update_threshold_bps'],
-        'target_position': TARGET_POSITION,
-        'max_position_size': MAX_POSITION_SIZE,
-        'inventory_skew_bps_per_unit': INVENTORY_SKEW_BPS_PER_UNIT,
-        'max_skew_bps': MAX_SKEW_BPS,
-        'inventory_skew_threshold': INVENTORY_SKEW_THRESHOLD,
-        'min_ask_buffer_bps': None,
-        'max_spot_perp_deviation_pct': CONFIG['safety']['max_spot_perp_deviation_pct'],
-        'smart_order_mgmt_enabled': CONFIG['safety']['smart_order_mgmt_enabled'],
-    }
-
     # This will auto-detect changes and log them to parameter_changes table
-    changed_id = param_manager.check_for_changes(current_config)
+    changed_id = param_manager.check_for_changes(dict(BOT_PARAM_CONFIG))
     if changed_id:
         print(f"   ✅ Configuration updated to parameter set #{changed_id}")
     else:
@@ -1526,10 +1854,11 @@ def main():
                 spot_coin=SPOT_COIN,  # "@260" for both API calls and WebSocket
                 account_address=account_address,
                 pair_name=PAIR_NAME,  # "PURR/USDC" for fill matching
-                update_threshold_bps=CONFIG['timing']['update_threshold_bps'],
-                on_update_callback=lambda update_type: None  # Can add logic here if needed
+                update_threshold_bps=CONFIG['timing']['update_threshold_bps']
             )
             ws_client.start()
+            # Kernel-scheduled staleness wake instead of get_event timeouts
+            ws_client.enable_stale_timer(FALLBACK_CHECK_SECONDS)
             print("   ✅ WebSocket ready - real-time data enabled!")
             print()
         except Exception as e:
@@ -1539,29 +1868,51 @@ def main():
             use_websocket = False
             print()
 
+    # Route hot-loop logging through a queue: the trading loop only enqueues
+    # records and a daemon listener thread does the formatting-to-stdout I/O,
+    # so the WebSocket wake path never blocks on terminal writes
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    log_listener.start()
+    log = logging.getLogger("mm")
+    log.setLevel(logging.INFO)
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.propagate = False
+
     iteration = 0
     last_quote_update = 0  # Set to 0 to force immediate first update
+    last_fill_safety_check = 0.0
 
     try:
         while True:
             iteration += 1
+            # One monotonic timestamp per iteration - reused for interval math
+            now = _now()
 
             # Check for rate limit stop
             if rate_limit_hit:
-                print("\n🛑 Bot stopped due to rate limiting. Exiting...")
+                log.info("\n🛑 Bot stopped due to rate limiting. Exiting...")
                 break
 
             # Event-driven mode: Wait for WebSocket updates
             if use_websocket and ws_client and ws_client.is_healthy():
-                # Block until update or timeout (instant wake-up on price changes!)
-                # Use FALLBACK_CHECK_SECONDS as timeout to ensure we check periodically
-                ws_client.wait_for_update(timeout=FALLBACK_CHECK_SECONDS)
-
-                # Check what triggered the wake-up
-                updates = ws_client.check_updates()
+                # Block until an update or the staleness timer fires (the
+                # timer re-arms on each real event, so idle periods produce a
+                # single 'timeout' wake instead of spurious timeouts); a short
+                # coalesce window folds tick bursts into one quote update.
+                # The doubled timeout here is only a backstop in case the
+                # timer thread dies.
+                updates = ws_client.get_event(timeout=FALLBACK_CHECK_SECONDS * 2,
+                                              coalesce=COALESCE_SECONDS)
+                # get_event can block for a long time on a quiet stream -
+                # re-take the timestamp so interval math below isn't computed
+                # against a pre-block value
+                now = _now()
 
                 # Update quotes if something changed or timeout occurred
-                time_since_last_update = time.time() - last_quote_update
+                time_since_last_update = now - last_quote_update
                 should_update = (
                     updates['orderbook'] or  # Market moved >5 bps
                     updates['fills'] or       # Got filled
@@ -1569,70 +1920,80 @@ def main():
                 )
 
                 if should_update:
-                    print(f"\n{'#'*80}")
-                    print(f"# Iteration {iteration}")
-                    if updates['orderbook']:
-                        print(f"# Trigger: Orderbook update")
-                    elif updates['fills']:
-                        print(f"# Trigger: Fill received")
-                    else:
-                        print(f"# Trigger: {FALLBACK_CHECK_SECONDS}s safety check")
-                    print(f"{'#'*80}")
+                    if BANNERS:
+                        log.info(f"\n{BANNER}")
+                        log.info(f"# Iteration {iteration}")
+                        if updates['orderbook']:
+                            log.info(f"# Trigger: Orderbook update")
+                        elif updates['fills']:
+                            log.info(f"# Trigger: Fill received")
+                        else:
+                            log.info(f"# Trigger: {FALLBACK_CHECK_SECONDS}s safety check")
+                        log.info(f"{BANNER}")
 
                     try:
                         # Check volatility circuit breaker
-                        should_pause, volatility_pct, time_window = check_volatility()
+                        should_pause, volatility_pct, time_window = check_volatility(now)
 
                         if should_pause:
                             # Circuit breaker active - don't update quotes
-                            print(f"\n⏸️  Circuit breaker active: {volatility_pct:.2f}% move in {time_window} minutes")
-                            print(f"   Waiting for market to stabilize...")
+                            # (skip all fetches; track price from the WS cache)
+                            record_paused_price(now)
+                            log.info(f"\n⏸️  Circuit breaker active: {volatility_pct:.2f}% move in {time_window} minutes")
+                            log.info(f"   Waiting for market to stabilize...")
                         else:
                             # Normal trading - update quotes
                             update_quotes()
 
-                        last_quote_update = time.time()
+                        last_quote_update = _now()
 
                         # Check if rate limit was hit during update
                         if rate_limit_hit:
                             break
                     except Exception as e:
-                        print(f"❌ Error in market making loop: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        print("\nContinuing to next iteration...")
-
-                    # Check and record fills
-                    try:
-                        check_and_record_fills()
-                    except Exception as e:
-                        print(f"⚠️  Error checking fills: {e}")
+                        # log.exception defers traceback formatting to the
+                        # listener thread instead of the trading loop
+                        log.exception(f"❌ Error in market making loop: {e}")
+                        log.info("\nContinuing to next iteration...")
+
+                    # Fills arrive via WS push, so only hit REST when a fill
+                    # event actually fired - plus a periodic safety net in
+                    # case a push was missed
+                    if updates['fills'] or now - last_fill_safety_check > FILL_SAFETY_NET_SECONDS:
+                        last_fill_safety_check = now
+                        try:
+                            check_and_record_fills()
+                        except Exception as e:
+                            log.error(f"⚠️  Error checking fills: {e}")
 
                 # No sleep needed! wait_for_update() blocks until next event
 
             else:
                 # WebSocket unhealthy or disabled - try to reconnect if unhealthy
                 if use_websocket and ws_client and not ws_client.is_healthy():
-                    print(f"\n⚠️  WebSocket connection unhealthy - attempting reconnection...")
+                    log.info(f"\n⚠️  WebSocket connection unhealthy - attempting reconnection...")
                     if ws_client.reconnect():
-                        print(f"   ✅ Reconnected! Resuming event-driven mode")
+                        log.info(f"   ✅ Reconnected! Resuming event-driven mode")
                         continue  # Skip this iteration, resume event-driven mode
                     else:
-                        print(f"   ❌ Reconnection failed, falling back to REST mode")
+                        log.info(f"   ❌ Reconnection failed, falling back to REST mode")
 
                 # REST-only mode: Use original timing
-                print(f"\n{'#'*80}")
-                print(f"# Iteration {iteration} (REST mode)")
-                print(f"{'#'*80}")
+                if BANNERS:
+                    log.info(f"\n{BANNER}")
+                    log.info(f"# Iteration {iteration} (REST mode)")
+                    log.info(f"{BANNER}")
 
                 try:
                     # Check volatility circuit breaker
-                    should_pause, volatility_pct, time_window = check_volatility()
+                    should_pause, volatility_pct, time_window = check_volatility(now)
 
                     if should_pause:
                         # Circuit breaker active - don't update quotes
-                        print(f"\n⏸️  Circuit breaker active: {volatility_pct:.2f}% move in {time_window} minutes")
-                        print(f"   Waiting for market to stabilize...")
+                        # (skip all fetches; track price from the WS cache)
+                        record_paused_price(now)
+                        log.info(f"\n⏸️  Circuit breaker active: {volatility_pct:.2f}% move in {time_window} minutes")
+                        log.info(f"   Waiting for market to stabilize...")
                     else:
                         # Normal trading - update quotes
                         update_quotes()
@@ -1641,21 +2002,20 @@ def main():
                     if rate_limit_hit:
                         break
                 except Exception as e:
-                    print(f"❌ Error in market making loop: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    print("\nContinuing to next iteration...")
+                    log.exception(f"❌ Error in market making loop: {e}")
+                    log.info("\nContinuing to next iteration...")
 
                 # Check and record fills every iteration
                 try:
                     check_and_record_fills()
                 except Exception as e:
-                    print(f"⚠️  Error checking fills: {e}")
+                    log.error(f"⚠️  Error checking fills: {e}")
 
-                print(f"\n⏸️  Sleeping {UPDATE_INTERVAL_SECONDS}s...")
+                log.info(f"\n⏸️  Sleeping {UPDATE_INTERVAL_SECONDS}s...")
                 time.sleep(UPDATE_INTERVAL_SECONDS)
 
     except KeyboardInterrupt:
+        log_listener.stop()  # Flush queued log records before shutdown output
         print("\n\n🛑 Shutting down market maker...")
 
         # Stop WebSocket
@@ -5,39 +5,292 @@ Provides Claude-powered config creation and strategy analysis
 Includes slide-out chat panel that can be embedded in any page
 """
 
-from flask import Blueprint, render_template_string, jsonify, request
-import anthropic
+from flask import Blueprint, Response, jsonify, request
+import functools
+import gzip
+import hashlib
+import itertools
 import json
+import math
+
+# orjson is optional - C-level (de)serializer, ~3-5x faster than stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import os
+import re
 import sys
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
 
 # Create blueprint
 ai_bp = Blueprint('ai_assistant', __name__, url_prefix='/ai')
 
-# Paths
-SETTINGS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.ai_settings.json')
-CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'trading_data.db')
+# Only bodies above this size are worth the gzip CPU cost
+COMPRESS_MIN_SIZE = 1024
+_COMPRESS_MIMETYPES = ('application/json', 'text/html')
+
+
+@ai_bp.after_request
+def _compress_response(response):
+    """Gzip sizable JSON/HTML responses when the client accepts it
+
+    Long chat transcripts easily reach tens of KB and JSON compresses
+    5-10x. Scoped to this blueprint so the dependency footprint stays
+    unchanged (no flask-compress); streamed responses (SSE) pass through
+    untouched.
+    """
+    if (response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or response.mimetype not in _COMPRESS_MIMETYPES
+            or response.headers.get('Content-Encoding')
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(data, 6))
+    response.headers['Content-Encoding'] = 'gzip'
+    vary = response.headers.get('Vary')
+    if vary:
+        if 'accept-encoding' not in vary.lower():
+            response.headers['Vary'] = vary + ', Accept-Encoding'
+    else:
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+# Paths (all derived from one resolved repo root)
+_ROOT = Path(__file__).resolve().parent.parent
+SETTINGS_FILE = str(_ROOT / '.ai_settings.json')
+CONFIG_DIR = str(_ROOT / 'config')
+DATABASE_PATH = str(_ROOT / 'trading_data.db')
 
 # Add lib to path for credentials
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'lib'))
+sys.path.insert(0, str(_ROOT / 'lib'))
+
+from cached_info import (
+    META_TTL,
+    cached_call,
+    get_all_mids,
+    get_info,
+    get_meta_and_asset_ctxs,
+    get_open_orders as cached_open_orders,
+    get_perp_ctx_index,
+    get_perp_index,
+    get_spot_index,
+    get_user_fills,
+    get_user_state,
+)
+from credentials import get_ai_settings, get_all_addresses
 
 # Pending actions (proposed but not yet confirmed)
-pending_actions = {}
+PENDING_MAX = 1024          # hard cap on stored proposals
+PENDING_TTL_SECONDS = 600   # abandoned proposals expire after 10 minutes
+
+
+class _TTLDict(dict):
+    """Insertion-ordered dict with a size cap and per-entry TTL
+
+    Keeps abandoned chat proposals from accumulating until process restart:
+    entries expire PENDING_TTL_SECONDS after insertion and the oldest are
+    evicted past PENDING_MAX. Pruning runs on insert and on the read paths
+    the routes use; call sites keep plain dict semantics. All access is
+    lock-guarded since chat/confirm/cancel run on different Flask threads.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._added = {}
+        self._lock = threading.RLock()
+
+    def _prune(self):
+        cutoff = time.time() - PENDING_TTL_SECONDS
+        for key in [k for k, t in self._added.items() if t < cutoff]:
+            del self._added[key]
+            super().__delitem__(key)
+        while len(self) > PENDING_MAX:
+            oldest = next(iter(self))
+            del self._added[oldest]
+            super().__delitem__(oldest)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self._added[key] = time.time()
+            self._prune()
+
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+            self._added.pop(key, None)
+
+    def __contains__(self, key):
+        with self._lock:
+            self._prune()
+            return super().__contains__(key)
+
+    def pop(self, key, *default):
+        with self._lock:
+            self._added.pop(key, None)
+            return super().pop(key, *default)
+
+    def values(self):
+        with self._lock:
+            self._prune()
+            return list(super().values())
+
+    def tail(self, n):
+        """Most recent n values, oldest first, without copying the dict"""
+        with self._lock:
+            self._prune()
+            keys = list(itertools.islice(reversed(self), n))
+            return [dict.__getitem__(self, k) for k in reversed(keys)]
+
+
+pending_actions = _TTLDict()
+
+# One SQLite connection per serving thread, reused across requests (avoids a
+# full DB open per query and keeps the statement cache warm)
+_local = threading.local()
+
+
+# Matches any nonzero digit - cheaper than float() for "is this balance
+# zero?" checks on the API's decimal strings
+_NONZERO_RE = re.compile(r'[1-9]')
+
+# Shared pool for fanning out per-account (and per-dex) API calls so K
+# accounts cost ~1 round-trip of wall clock instead of K serial ones
+_HL_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+
+# Separate pool for chat tool calls: execute_tool fans out into _HL_EXECUTOR
+# itself, so sharing one pool could fill it with tasks waiting on their own
+# inner futures
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+
+def _conn() -> sqlite3.Connection:
+    """Get this thread's persistent database connection"""
+    c = getattr(_local, 'conn', None)
+    if c is None:
+        c = sqlite3.connect(DATABASE_PATH)
+        c.row_factory = sqlite3.Row
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("PRAGMA mmap_size=268435456")   # 256 MB - keep hot pages mapped
+        c.execute("PRAGMA cache_size=-65536")     # 64 MB page cache
+        c.execute("PRAGMA temp_store=MEMORY")
+        _local.conn = c
+    return c
+
+
+@functools.lru_cache(maxsize=1)
+def _anthropic():
+    """Import the anthropic SDK on first use (it pulls in httpx + pydantic,
+    so keep it off the dashboard's cold-start path)"""
+    import anthropic
+    return anthropic
+
+
+# One client per API key, reused across requests so the underlying httpx
+# pool keeps its TLS connections to api.anthropic.com warm
+_client_cache = {}
+_client_lock = threading.Lock()
+CLIENT_CACHE_MAX = 4
+
+
+def get_client(api_key):
+    """Get a cached Anthropic client for this API key"""
+    client = _client_cache.get(api_key)
+    if client is None:
+        with _client_lock:
+            client = _client_cache.get(api_key)
+            if client is None:
+                client = _anthropic().Anthropic(
+                    api_key=api_key, max_retries=2, timeout=60.0
+                )
+                while len(_client_cache) >= CLIENT_CACHE_MAX:
+                    _client_cache.pop(next(iter(_client_cache)))
+                _client_cache[api_key] = client
+    return client
+
+
+# Parsed settings cached against the settings file's mtime so the common
+# case (/chat, /settings) costs one os.stat instead of an open+parse
+_settings_cache = {'mtime': None, 'data': None}
+_settings_lock = threading.Lock()
 
 
 def load_settings():
     """Load AI settings from .env (falls back to .ai_settings.json)"""
-    from credentials import get_ai_settings
-    return get_ai_settings()
+    try:
+        mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+    except OSError:
+        mtime = 0
+    with _settings_lock:
+        if _settings_cache['mtime'] != mtime:
+            _settings_cache['data'] = get_ai_settings()
+            _settings_cache['mtime'] = mtime
+        # Shallow copy so callers mutating their settings dict (e.g.
+        # update_settings) don't write through into the cache
+        return dict(_settings_cache['data'])
+
+
+def _load_json(path):
+    """Parse a JSON file, via orjson's C parser when available"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 def save_settings(settings):
     """Save AI settings to file (for UI-edited values)"""
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=2)
+    if orjson is not None:
+        with open(SETTINGS_FILE, 'wb') as f:
+            f.write(orjson.dumps(settings, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    else:
+        with open(SETTINGS_FILE, 'w') as f:
+            json.dump(settings, f, indent=2)
+    with _settings_lock:
+        _settings_cache['mtime'] = None  # force reparse on next load
+
+
+def _write_config_atomic(filepath: str, config: dict) -> bool:
+    """Write a config file atomically; returns False if disk already matches
+
+    Serializes once and skips the write entirely when the on-disk bytes are
+    identical (common when a user reconfirms an unchanged proposal).
+    Otherwise writes to a temp file, fsyncs, and os.replace()s into place so
+    a crash mid-write can never leave a half-written config for a running
+    bot to load. The rename also bumps mtime exactly once, which keeps the
+    mtime-keyed config caches honest.
+    """
+    if orjson is not None:
+        new_bytes = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    else:
+        new_bytes = json.dumps(config, indent=2).encode()
+
+    try:
+        with open(filepath, 'rb') as f:
+            if f.read() == new_bytes:
+                return False
+    except OSError:
+        pass
+
+    tmp = filepath + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(new_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filepath)
+    return True
 
 
 # ============================================================================
@@ -47,51 +300,48 @@ def save_settings(settings):
 def get_market_info(symbol: str) -> dict:
     """Look up market info from Hyperliquid API (cached)"""
     try:
-        from cached_info import get_meta, get_spot_meta
-
-        meta = get_meta()
+        sym_upper = symbol.upper()
+
+        # Perp markets: O(1) hit on the prebuilt name index
+        hit = get_perp_index().get(sym_upper)
+        if hit:
+            market = hit[1]
+            return {
+                'found': True,
+                'type': 'perp',
+                'symbol': market['name'],
+                'size_decimals': market.get('szDecimals', 2),
+                'max_leverage': market.get('maxLeverage', 50),
+                'raw': market
+            }
 
-        # Search in perp markets
-        for market in meta.get('universe', []):
-            if market['name'].upper() == symbol.upper():
-                return {
-                    'found': True,
-                    'type': 'perp',
-                    'symbol': market['name'],
-                    'size_decimals': market.get('szDecimals', 2),
-                    'max_leverage': market.get('maxLeverage', 50),
-                    'raw': market
-                }
+        # Spot tokens: O(1) hit on the prebuilt name index
+        spot_index = get_spot_index()
+        market = spot_index['token_by_name'].get(sym_upper)
+        if market:
+            return {
+                'found': True,
+                'type': 'spot',
+                'symbol': market['name'],
+                'token_id': market.get('tokenId'),
+                'size_decimals': market.get('szDecimals', 2),
+                'wei_decimals': market.get('weiDecimals', 8),
+                'raw': market
+            }
 
-        # Search in spot markets
-        spot_meta = get_spot_meta()
-        for i, market in enumerate(spot_meta.get('tokens', [])):
-            if market.get('name', '').upper() == symbol.upper():
+        # Check spot universe for pairs (substring match over prebuilt uppers)
+        for name_upper, market in spot_index['universe_upper']:
+            tokens = market.get('tokens', [])
+            if len(tokens) >= 2 and sym_upper in name_upper:
                 return {
                     'found': True,
-                    'type': 'spot',
-                    'symbol': market['name'],
-                    'token_id': market.get('tokenId'),
-                    'size_decimals': market.get('szDecimals', 2),
-                    'wei_decimals': market.get('weiDecimals', 8),
+                    'type': 'spot_pair',
+                    'name': market.get('name', ''),
+                    'index': market.get('index'),
+                    'tokens': tokens,
                     'raw': market
                 }
 
-        # Check spot universe for pairs
-        for market in spot_meta.get('universe', []):
-            tokens = market.get('tokens', [])
-            if len(tokens) >= 2:
-                name = market.get('name', '')
-                if symbol.upper() in name.upper():
-                    return {
-                        'found': True,
-                        'type': 'spot_pair',
-                        'name': name,
-                        'index': market.get('index'),
-                        'tokens': tokens,
-                        'raw': market
-                    }
-
         return {'found': False, 'error': f'Market {symbol} not found'}
 
     except Exception as e:
@@ -101,13 +351,23 @@ def get_market_info(symbol: str) -> dict:
 def get_spot_coin_id(symbol: str) -> dict:
     """Get the spot coin identifier for Hyperliquid (cached)"""
     try:
-        from cached_info import get_spot_meta
-        spot_meta = get_spot_meta()
+        sym_upper = symbol.upper()
+        # Memoize per symbol so repeat lookups skip the substring scan
+        return cached_call(f'spot_coin_id:{sym_upper}', _spot_coin_id_scan,
+                           ttl=META_TTL, args=(sym_upper,))
+    except Exception as e:
+        return {'found': False, 'error': str(e)}
+
+
+def _spot_coin_id_scan(sym_upper: str) -> dict:
+    """Substring-scan the spot token and pair indexes for a symbol"""
+    try:
+        spot_index = get_spot_index()
 
         results = []
 
-        for token in spot_meta.get('tokens', []):
-            if symbol.upper() in token.get('name', '').upper():
+        for name_upper, token in spot_index['tokens_upper']:
+            if sym_upper in name_upper:
                 results.append({
                     'name': token.get('name'),
                     'token_id': token.get('tokenId'),
@@ -116,19 +376,18 @@ def get_spot_coin_id(symbol: str) -> dict:
                     'spot_coin_format': f"@{token.get('index')}" if not token.get('isCanonical') else f"{token.get('name')}/USDC"
                 })
 
-        for market in spot_meta.get('universe', []):
-            name = market.get('name', '')
-            if symbol.upper() in name.upper():
+        for name_upper, market in spot_index['universe_upper']:
+            if sym_upper in name_upper:
                 idx = market.get('index')
                 results.append({
-                    'pair_name': name,
+                    'pair_name': market.get('name', ''),
                     'index': idx,
-                    'spot_coin_format': f"@{idx}" if idx else name
+                    'spot_coin_format': f"@{idx}" if idx else market.get('name', '')
                 })
 
         if results:
             return {'found': True, 'results': results}
-        return {'found': False, 'error': f'No spot market found for {symbol}'}
+        return {'found': False, 'error': f'No spot market found for {sym_upper}'}
 
     except Exception as e:
         return {'found': False, 'error': str(e)}
@@ -141,49 +400,100 @@ def read_config(filename: str) -> dict:
         if not os.path.exists(filepath):
             return {'found': False, 'error': f'Config {filename} not found'}
 
-        with open(filepath, 'r') as f:
-            config = json.load(f)
+        config = _load_json(filepath)
 
         return {'found': True, 'config': config, 'filepath': filepath}
     except Exception as e:
         return {'found': False, 'error': str(e)}
 
 
+# Parsed config directory, keyed by a scandir mtime signature so warm calls
+# cost one directory walk of stats instead of opening and parsing every JSON
+_config_cache_lock = threading.Lock()
+_config_cache = {'sig': None, 'configs': [], 'markets': frozenset()}
+_config_file_cache = {}  # filename -> (mtime_ns, parsed config)
+
+
+def _scan_configs():
+    """Return (configs, markets) for CONFIG_DIR, cached on file mtimes
+
+    configs is a list of (filename, parsed config) tuples; markets is the
+    frozenset of uppercase coin names referenced by any config. Unparseable
+    files are skipped.
+    """
+    entries = []
+    with os.scandir(CONFIG_DIR) as it:
+        for entry in it:
+            if entry.name.endswith('.json') and entry.name != 'config.json':
+                entries.append((entry.name, entry.path, entry.stat().st_mtime_ns))
+    entries.sort()
+    sig = tuple((name, mtime) for name, _, mtime in entries)
+
+    with _config_cache_lock:
+        if sig == _config_cache['sig']:
+            return _config_cache['configs'], _config_cache['markets']
+
+    # Incremental rebuild: only files whose mtime changed get re-parsed
+    configs = []
+    markets = set()
+    file_cache = {}
+    for name, path, mtime in entries:
+        cached = _config_file_cache.get(name)
+        if cached is not None and cached[0] == mtime:
+            config = cached[1]
+        else:
+            try:
+                config = _load_json(path)
+            except Exception:
+                continue
+        file_cache[name] = (mtime, config)
+        configs.append((name, config))
+        if 'market' in config:
+            markets.add(config['market'].upper())
+        if 'pair' in config:
+            markets.add(config['pair'].split('/')[0].upper())
+
+    markets = frozenset(markets)
+    with _config_cache_lock:
+        _config_file_cache.clear()
+        _config_file_cache.update(file_cache)
+        _config_cache.update(sig=sig, configs=configs, markets=markets)
+    return configs, markets
+
+
 def list_configs() -> dict:
     """List all config files"""
     try:
         configs = []
-        for filename in os.listdir(CONFIG_DIR):
-            if filename.endswith('.json') and filename != 'config.json':
-                filepath = os.path.join(CONFIG_DIR, filename)
-                with open(filepath, 'r') as f:
-                    config = json.load(f)
-
-                if 'pair' in config:
-                    config_type = 'spot'
-                    market = config.get('pair')
-                elif 'grid' in config:
-                    config_type = 'grid'
-                    market = config.get('market')
-                elif 'market' in config:
-                    config_type = 'perp'
-                    market = config.get('market')
-                else:
-                    config_type = 'unknown'
-                    market = 'unknown'
-
-                configs.append({
-                    'filename': filename,
-                    'type': config_type,
-                    'market': market,
-                    'description': config.get('description', '')
-                })
+        for filename, config in _scan_configs()[0]:
+            if 'pair' in config:
+                config_type = 'spot'
+                market = config.get('pair')
+            elif 'grid' in config:
+                config_type = 'grid'
+                market = config.get('market')
+            elif 'market' in config:
+                config_type = 'perp'
+                market = config.get('market')
+            else:
+                config_type = 'unknown'
+                market = 'unknown'
+
+            configs.append({
+                'filename': filename,
+                'type': config_type,
+                'market': market,
+                'description': config.get('description', '')
+            })
 
         return {'configs': configs}
     except Exception as e:
         return {'error': str(e)}
 
 
+_WINDOW_HOURS = {'1h': 1, '4h': 4, '8h': 8, '24h': 24, '7d': 168}
+
+
 def get_performance_metrics(config_filename: str, window: str = '24h') -> dict:
     """Get trading performance metrics for a config"""
     try:
@@ -200,54 +510,44 @@ def get_performance_metrics(config_filename: str, window: str = '24h') -> dict:
         else:
             market = f"{config.get('market')}-PERP"
 
-        now = datetime.utcnow()
-        if window == '1h':
-            start_time = now - timedelta(hours=1)
-        elif window == '4h':
-            start_time = now - timedelta(hours=4)
-        elif window == '8h':
-            start_time = now - timedelta(hours=8)
-        elif window == '24h':
-            start_time = now - timedelta(hours=24)
-        elif window == '7d':
-            start_time = now - timedelta(days=7)
-        else:
-            start_time = now - timedelta(hours=24)
+        # Pure integer window math; the epoch binds straight against the
+        # generated ts_epoch column (migration 004)
+        hours = _WINDOW_HOURS.get(window, 24)
+        start_epoch = int(time.time()) - hours * 3600
 
-        start_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
-
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = _conn()
         cursor = conn.cursor()
 
+        # Both aggregates reduce to a single row, so fuse them into one
+        # round-trip with a scalar cross join; each arm range-scans its
+        # (pair, timestamp) index (migrations 002/003)
         cursor.execute("""
-            SELECT
-                COUNT(*) as total_fills,
-                SUM(CASE WHEN side = 'buy' THEN 1 ELSE 0 END) as buys,
-                SUM(CASE WHEN side = 'sell' THEN 1 ELSE 0 END) as sells,
-                SUM(quote_amount) as volume,
-                SUM(fee) as total_fees,
-                SUM(realized_pnl) as realized_pnl,
-                AVG(spread_bps) as avg_spread_captured
-            FROM fills
-            WHERE pair = ? AND timestamp >= ?
-        """, (market, start_str))
+            WITH f AS (
+                SELECT
+                    COUNT(*) as total_fills,
+                    COUNT(*) FILTER (WHERE side = 'buy') as buys,
+                    COUNT(*) FILTER (WHERE side = 'sell') as sells,
+                    SUM(quote_amount) as volume,
+                    SUM(fee) as total_fees,
+                    SUM(realized_pnl) as realized_pnl,
+                    AVG(spread_bps) as avg_spread_captured
+                FROM fills
+                WHERE pair = ? AND ts_epoch >= ?
+            ), m AS (
+                SELECT
+                    COUNT(*) as minutes,
+                    COUNT(*) FILTER (WHERE bid_live = 1 AND ask_live = 1) as both_live_minutes
+                FROM metrics_1min
+                WHERE pair = ? AND ts_epoch >= ?
+            )
+            SELECT * FROM f, m
+        """, (market, start_epoch, market, start_epoch))
 
         fills_row = cursor.fetchone()
-
-        cursor.execute("""
-            SELECT
-                COUNT(*) as minutes,
-                SUM(CASE WHEN bid_live = 1 AND ask_live = 1 THEN 1 ELSE 0 END) as both_live_minutes
-            FROM metrics_1min
-            WHERE pair = ? AND timestamp >= ?
-        """, (market, start_str))
-
-        metrics_row = cursor.fetchone()
-        conn.close()
+        metrics_row = fills_row
+        cursor.close()
 
         total_fills = fills_row['total_fills'] or 0
-        hours = (now - start_time).total_seconds() / 3600
         fills_per_hour = total_fills / hours if hours > 0 else 0
 
         uptime_pct = None
@@ -275,20 +575,23 @@ def get_performance_metrics(config_filename: str, window: str = '24h') -> dict:
 
 def _get_hl_info():
     """Get shared Hyperliquid Info client with HIP-3 support (cached)"""
-    from cached_info import get_info
     return get_info()
 
 
+@functools.lru_cache(maxsize=256)
+def _short_addr(addr: str) -> str:
+    """Display form of a wallet address (cached - few distinct addresses)"""
+    return addr[:10] + '...' + addr[-4:]
+
+
 def _get_all_addresses() -> list:
     """Get main account + all subaccount addresses from accounts.json"""
-    from credentials import get_all_addresses
     return get_all_addresses()
 
 
 def get_account_balances(address: str = None) -> dict:
     """Get account balances (USDC + spot tokens + perp margin summary) (cached)"""
     try:
-        from cached_info import get_user_state, cached_call, get_info
         info = get_info()
 
         if address:
@@ -296,11 +599,8 @@ def get_account_balances(address: str = None) -> dict:
         else:
             accounts = _get_all_addresses()
 
-        results = []
-        for acct in accounts:
+        def fetch(acct):
             addr = acct['address']
-            if not addr:
-                continue
 
             # Perp account state (margin, account value) — cached 30s
             user_state = get_user_state(addr)
@@ -318,23 +618,31 @@ def get_account_balances(address: str = None) -> dict:
                 except Exception:
                     pass
 
-            # Spot balances (cached 30s)
-            spot_resp = cached_call(f'spot_state:{addr}', info.post, ttl=30,
-                                   args=("/info", {"type": "spotClearinghouseState", "user": addr}))
+            # Spot balances (cached 30s). Called inline: fetch() already runs
+            # on _HL_EXECUTOR, and submitting back to the same pool and
+            # blocking on the result can deadlock once every worker is a
+            # fetch() waiting on an inner future
+            spot_resp = cached_call(
+                f'spot_state:{addr}', info.post, 30,
+                ("/info", {"type": "spotClearinghouseState", "user": addr}))
             spot_balances = spot_resp.get('balances', []) if isinstance(spot_resp, dict) else []
 
-            results.append({
+            return {
                 'label': acct['label'],
-                'address': addr[:10] + '...' + addr[-4:],
+                'address': _short_addr(addr),
                 'account_value_usd': acct_value,
                 'total_margin_used': margin.get('totalMarginUsed'),
                 'withdrawable': margin.get('withdrawable'),
                 'total_notional_position': margin.get('totalNtlPos'),
                 'spot_balances': [
                     {'coin': b['coin'], 'total': b['total'], 'hold': b['hold']}
-                    for b in spot_balances if float(b.get('total', 0)) != 0
+                    for b in spot_balances if _NONZERO_RE.search(b.get('total') or '')
                 ]
-            })
+            }
+
+        # Fan out per account; collect in account order
+        futures = [_HL_EXECUTOR.submit(fetch, a) for a in accounts if a['address']]
+        results = [f.result() for f in futures]
 
         return {'accounts': results}
 
@@ -345,43 +653,44 @@ def get_account_balances(address: str = None) -> dict:
 def get_open_positions(address: str = None) -> dict:
     """Get current open perp positions with PnL (cached)"""
     try:
-        from cached_info import get_user_state
-
         if address:
             accounts = [{'address': address, 'label': 'Requested'}]
         else:
             accounts = _get_all_addresses()
 
-        results = []
-        for acct in accounts:
-            addr = acct['address']
-            if not addr:
-                continue
+        # One (cached) mids fetch covers mark prices for every position
+        all_mids = get_all_mids()
 
+        def fetch(acct):
+            addr = acct['address']
             user_state = get_user_state(addr)
-            positions = []
-            for pos in user_state.get('assetPositions', []):
-                p = pos.get('position', {})
-                if float(p.get('szi', 0)) != 0:
-                    positions.append({
-                        'coin': p.get('coin'),
-                        'size': p.get('szi'),
-                        'entry_price': p.get('entryPx'),
-                        'mark_price': p.get('positionValue') and str(round(abs(float(p.get('positionValue', 0))) / max(abs(float(p.get('szi', 1))), 0.0001), 4)),
-                        'unrealized_pnl': p.get('unrealizedPnl'),
-                        'return_on_equity': p.get('returnOnEquity'),
-                        'leverage_type': p.get('leverage', {}).get('type'),
-                        'leverage_value': p.get('leverage', {}).get('value'),
-                        'liquidation_price': p.get('liquidationPx'),
-                        'margin_used': p.get('marginUsed')
-                    })
+            positions = [
+                {
+                    'coin': p.get('coin'),
+                    'size': p.get('szi'),
+                    'entry_price': p.get('entryPx'),
+                    'mark_price': all_mids.get(p.get('coin')),
+                    'unrealized_pnl': p.get('unrealizedPnl'),
+                    'return_on_equity': p.get('returnOnEquity'),
+                    'leverage_type': p.get('leverage', {}).get('type'),
+                    'leverage_value': p.get('leverage', {}).get('value'),
+                    'liquidation_price': p.get('liquidationPx'),
+                    'margin_used': p.get('marginUsed')
+                }
+                for p in (pos.get('position', {}) for pos in user_state.get('assetPositions', []))
+                if _NONZERO_RE.search(p.get('szi') or '')
+            ]
 
             if positions:
-                results.append({
+                return {
                     'label': acct['label'],
-                    'address': addr[:10] + '...' + addr[-4:],
+                    'address': _short_addr(addr),
                     'positions': positions
-                })
+                }
+            return None
+
+        futures = [_HL_EXECUTOR.submit(fetch, a) for a in accounts if a['address']]
+        results = [r for r in (f.result() for f in futures) if r]
 
         return {'accounts_with_positions': results} if results else {'message': 'No open positions found'}
 
@@ -392,41 +701,47 @@ def get_open_positions(address: str = None) -> dict:
 def get_open_orders(address: str = None) -> dict:
     """Get current open orders (cached)"""
     try:
-        from cached_info import get_open_orders as cached_open_orders
-
         if address:
             accounts = [{'address': address, 'label': 'Requested'}]
         else:
             accounts = _get_all_addresses()
 
-        results = []
         dexes = ["", "xyz", "flx"]
 
-        for acct in accounts:
-            addr = acct['address']
-            if not addr:
-                continue
+        def fetch_dex(addr, dex):
+            try:
+                return [
+                    {
+                        'coin': o.get('coin'),
+                        'side': 'Buy' if o.get('side') == 'B' else 'Sell',
+                        'price': o.get('limitPx'),
+                        'size': o.get('sz'),
+                        'order_id': o.get('oid'),
+                        'dex': dex or 'main'
+                    }
+                    for o in cached_open_orders(addr, dex=dex)
+                ]
+            except Exception:
+                return []
+
+        # Fan out every (account, dex) pair in parallel
+        live_accounts = [a for a in accounts if a['address']]
+        futures = {
+            (acct['address'], dex): _HL_EXECUTOR.submit(fetch_dex, acct['address'], dex)
+            for acct in live_accounts for dex in dexes
+        }
 
+        results = []
+        for acct in live_accounts:
+            addr = acct['address']
             orders = []
             for dex in dexes:
-                try:
-                    dex_orders = cached_open_orders(addr, dex=dex)
-                    for o in dex_orders:
-                        orders.append({
-                            'coin': o.get('coin'),
-                            'side': 'Buy' if o.get('side') == 'B' else 'Sell',
-                            'price': o.get('limitPx'),
-                            'size': o.get('sz'),
-                            'order_id': o.get('oid'),
-                            'dex': dex or 'main'
-                        })
-                except:
-                    pass
+                orders.extend(futures[(addr, dex)].result())
 
             if orders:
                 results.append({
                     'label': acct['label'],
-                    'address': addr[:10] + '...' + addr[-4:],
+                    'address': _short_addr(addr),
                     'order_count': len(orders),
                     'orders': orders
                 })
@@ -440,39 +755,34 @@ def get_open_orders(address: str = None) -> dict:
 def get_current_prices(symbols: list = None) -> dict:
     """Get current mark prices for markets (cached)"""
     try:
-        from cached_info import get_all_mids
         all_mids = get_all_mids()
 
+        # Uppercase each key once; exact lookups become O(1) dict hits
+        upper_keys = {k.upper(): k for k in all_mids}
+
         if symbols:
             filtered = {}
             for sym in symbols:
                 sym_upper = sym.upper()
-                for k, v in all_mids.items():
-                    if sym_upper in k.upper():
-                        filtered[k] = v
+                exact = upper_keys.get(sym_upper)
+                if exact is not None:
+                    filtered[exact] = all_mids[exact]
+                    continue
+                for k_upper, k in upper_keys.items():
+                    if sym_upper in k_upper:
+                        filtered[k] = all_mids[k]
             return {'prices': filtered} if filtered else {'error': f'No prices found for {symbols}'}
 
-        # If no filter, return a manageable subset (markets we trade)
-        our_markets = set()
-        for filename in os.listdir(CONFIG_DIR):
-            if not filename.endswith('.json') or filename == 'config.json':
-                continue
-            try:
-                with open(os.path.join(CONFIG_DIR, filename), 'r') as f:
-                    cfg = json.load(f)
-                if 'market' in cfg:
-                    our_markets.add(cfg['market'].upper())
-                if 'pair' in cfg:
-                    pair = cfg['pair'].split('/')[0].upper()
-                    our_markets.add(pair)
-            except:
-                pass
+        # If no filter, return a manageable subset (markets we trade):
+        # one compiled alternation pass instead of a markets x keys loop
+        our_markets = _scan_configs()[1]
 
         relevant = {}
-        for k, v in all_mids.items():
-            for m in our_markets:
-                if m in k.upper():
-                    relevant[k] = v
+        if our_markets:
+            pattern = re.compile('|'.join(map(re.escape, our_markets)))
+            for k_upper, k in upper_keys.items():
+                if pattern.search(k_upper):
+                    relevant[k] = all_mids[k]
         return {'prices': relevant, 'note': 'Showing prices for configured markets. Pass symbols for specific lookups.'}
 
     except Exception as e:
@@ -482,25 +792,17 @@ def get_current_prices(symbols: list = None) -> dict:
 def get_recent_fills_live(address: str = None, limit: int = 20) -> dict:
     """Get recent fills from Hyperliquid API (cached 30s)"""
     try:
-        from cached_info import get_user_fills
-
         if address:
             accounts = [{'address': address, 'label': 'Requested'}]
         else:
             accounts = _get_all_addresses()
 
-        results = []
-        for acct in accounts:
+        def fetch(acct):
             addr = acct['address']
-            if not addr:
-                continue
-
             try:
                 fills = get_user_fills(addr)
-                recent = fills[:limit] if fills else []
-                formatted = []
-                for f in recent:
-                    formatted.append({
+                formatted = [
+                    {
                         'coin': f.get('coin'),
                         'side': f.get('side'),
                         'price': f.get('px'),
@@ -509,16 +811,22 @@ def get_recent_fills_live(address: str = None, limit: int = 20) -> dict:
                         'closed_pnl': f.get('closedPnl'),
                         'time': f.get('time'),
                         'crossed': f.get('crossed', False)
-                    })
+                    }
+                    for f in (fills[:limit] if fills else [])
+                ]
 
                 if formatted:
-                    results.append({
+                    return {
                         'label': acct['label'],
-                        'address': addr[:10] + '...' + addr[-4:],
+                        'address': _short_addr(addr),
                         'fills': formatted
-                    })
-            except:
+                    }
+            except Exception:
                 pass
+            return None
+
+        futures = [_HL_EXECUTOR.submit(fetch, a) for a in accounts if a['address']]
+        results = [r for r in (f.result() for f in futures) if r]
 
         return {'accounts_with_fills': results} if results else {'message': 'No recent fills found'}
 
@@ -526,10 +834,28 @@ def get_recent_fills_live(address: str = None, limit: int = 20) -> dict:
         return {'error': str(e)}
 
 
+def _price_decimals(mark_px_str: str) -> int:
+    """Price decimals implied by a mark-price string, floored by the
+    exchange's 5-significant-figures rule (whichever is more precise)"""
+    dot = mark_px_str.find('.')
+    if dot < 0:
+        decimals = 0
+    else:
+        trailing_zeros = len(mark_px_str) - len(mark_px_str.rstrip('0'))
+        decimals = len(mark_px_str) - dot - 1 - trailing_zeros
+    try:
+        mark_price = float(mark_px_str)
+        if mark_price > 0:
+            integer_digits = math.floor(math.log10(mark_price)) + 1 if mark_price >= 1 else 1
+            decimals = max(decimals, 5 - integer_digits)
+    except (ValueError, OverflowError):
+        pass
+    return max(decimals, 0)
+
+
 def get_asset_info(asset: str) -> dict:
     """Get detailed asset info including price_decimals, size_decimals, tick size, max leverage, and mark price (cached)."""
     try:
-        from cached_info import get_meta_and_asset_ctxs
         asset_upper = asset.upper()
 
         # --- Check perp markets first (cached 60s) ---
@@ -537,69 +863,46 @@ def get_asset_info(asset: str) -> dict:
         universe = meta_ctx[0]['universe']
         contexts = meta_ctx[1]
 
-        for i, market in enumerate(universe):
-            if market['name'].upper() == asset_upper:
-                ctx = contexts[i]
-                mark_px_str = ctx.get('markPx', '0')
-                sz_decimals = market.get('szDecimals', 2)
-                max_leverage = market.get('maxLeverage', 50)
-
-                # Determine price_decimals from markPx string
-                if '.' in mark_px_str:
-                    price_decimals = len(mark_px_str.rstrip('0').split('.')[1])
-                    # Ensure at least what the string shows (don't strip trailing zeros too aggressively)
-                    # Use the raw string length as the authoritative source
-                    price_decimals_raw = len(mark_px_str.split('.')[1])
-                else:
-                    price_decimals = 0
-                    price_decimals_raw = 0
-
-                # Cross-check with 5-significant-figures rule
-                try:
-                    mark_price = float(mark_px_str)
-                    if mark_price > 0:
-                        import math
-                        integer_digits = len(str(int(mark_price)))
-                        sig_fig_decimals = max(0, 5 - integer_digits)
-                        # Use the more conservative (higher precision) of the two
-                        price_decimals = max(price_decimals, sig_fig_decimals)
-                except (ValueError, OverflowError):
-                    mark_price = 0.0
-
-                tick_size = 10 ** (-price_decimals)
-
-                return {
-                    'found': True,
-                    'type': 'perp',
-                    'asset': market['name'],
-                    'mark_price': mark_px_str,
-                    'price_decimals': price_decimals,
-                    'size_decimals': sz_decimals,
-                    'tick_size': tick_size,
-                    'max_leverage': max_leverage,
-                    'funding_rate': ctx.get('funding'),
-                    'open_interest': ctx.get('openInterest'),
-                    'note': f"price_decimals={price_decimals} derived from markPx='{mark_px_str}' and 5-sig-fig rule"
-                }
+        i = get_perp_ctx_index().get(asset_upper)
+        if i is not None:
+            market = universe[i]
+            ctx = contexts[i]
+            mark_px_str = ctx.get('markPx', '0')
+            sz_decimals = market.get('szDecimals', 2)
+            max_leverage = market.get('maxLeverage', 50)
+
+            price_decimals = _price_decimals(mark_px_str)
+            tick_size = 10 ** (-price_decimals)
+
+            return {
+                'found': True,
+                'type': 'perp',
+                'asset': market['name'],
+                'mark_price': mark_px_str,
+                'price_decimals': price_decimals,
+                'size_decimals': sz_decimals,
+                'tick_size': tick_size,
+                'max_leverage': max_leverage,
+                'funding_rate': ctx.get('funding'),
+                'open_interest': ctx.get('openInterest'),
+                'note': f"price_decimals={price_decimals} derived from markPx='{mark_px_str}' and 5-sig-fig rule"
+            }
 
         # --- Check spot markets ---
-        from cached_info import get_info, cached_call
         info = get_info()
-        spot_meta = cached_call('spot_meta_and_ctx', info.post, ttl=300,
+        spot_meta = cached_call('spot_meta_and_ctx', info.post, ttl=META_TTL,
                                 args=('/info', {'type': 'spotMetaAndAssetCtxs'}))
-        spot_tokens = spot_meta[0].get('tokens', [])
         spot_universe = spot_meta[0].get('universe', [])
         spot_contexts = spot_meta[1]
 
-        # Build a mapping from token index to token info
-        token_by_index = {t['index']: t for t in spot_tokens}
+        # Token index -> token info mapping (prebuilt once per meta refresh)
+        token_by_index = get_spot_index()['token_by_index']
 
         for i, pair in enumerate(spot_universe):
             tokens = pair.get('tokens', [])
             pair_name = pair.get('name', '')
-            # Match against the base token name
-            base_token_idx = tokens[0] if len(tokens) >= 2 else None
-            base_token = token_by_index.get(base_token_idx, {})
+            # Match against the base token name (each name uppercased once)
+            base_token = token_by_index.get(tokens[0], {}) if len(tokens) >= 2 else {}
             base_name = base_token.get('name', '')
 
             if base_name.upper() == asset_upper or asset_upper in pair_name.upper():
@@ -607,25 +910,7 @@ def get_asset_info(asset: str) -> dict:
                 mark_px_str = ctx.get('markPx') or ctx.get('midPx', '0')
                 sz_decimals = base_token.get('szDecimals', 2)
 
-                # Determine price_decimals from markPx string
-                if '.' in mark_px_str:
-                    price_decimals = len(mark_px_str.rstrip('0').split('.')[1])
-                    price_decimals_raw = len(mark_px_str.split('.')[1])
-                else:
-                    price_decimals = 0
-                    price_decimals_raw = 0
-
-                # Cross-check with 5-significant-figures rule
-                try:
-                    mark_price = float(mark_px_str)
-                    if mark_price > 0:
-                        import math
-                        integer_digits = len(str(int(mark_price)))
-                        sig_fig_decimals = max(0, 5 - integer_digits)
-                        price_decimals = max(price_decimals, sig_fig_decimals)
-                except (ValueError, OverflowError):
-                    mark_price = 0.0
-
+                price_decimals = _price_decimals(mark_px_str)
                 tick_size = 10 ** (-price_decimals)
 
                 return {
@@ -844,112 +1129,12 @@ TOOLS = [
     }
 ]
 
+# Mark the static prefix (tool definitions + system prompt) as cacheable on
+# Anthropic's side. Cache hits require a byte-identical prefix, so both live
+# in module constants rather than being rebuilt per request.
+TOOLS[-1]["cache_control"] = {"type": "ephemeral"}
 
-def execute_tool(tool_name: str, tool_input: dict) -> str:
-    """Execute a tool and return the result"""
-    if tool_name == "get_market_info":
-        result = get_market_info(tool_input.get("symbol", ""))
-    elif tool_name == "get_spot_coin_id":
-        result = get_spot_coin_id(tool_input.get("symbol", ""))
-    elif tool_name == "read_config":
-        result = read_config(tool_input.get("filename", ""))
-    elif tool_name == "list_configs":
-        result = list_configs()
-    elif tool_name == "get_performance_metrics":
-        result = get_performance_metrics(
-            tool_input.get("config_filename", ""),
-            tool_input.get("window", "24h")
-        )
-    elif tool_name == "propose_new_config":
-        result = propose_new_config(
-            tool_input.get("config", {}),
-            tool_input.get("filename", ""),
-            tool_input.get("description", "")
-        )
-    elif tool_name == "propose_config_changes":
-        result = propose_config_changes(
-            tool_input.get("filename", ""),
-            tool_input.get("changes", {}),
-            tool_input.get("reason", "")
-        )
-    elif tool_name == "get_account_balances":
-        result = get_account_balances(tool_input.get("address"))
-    elif tool_name == "get_open_positions":
-        result = get_open_positions(tool_input.get("address"))
-    elif tool_name == "get_open_orders":
-        result = get_open_orders(tool_input.get("address"))
-    elif tool_name == "get_current_prices":
-        result = get_current_prices(tool_input.get("symbols"))
-    elif tool_name == "get_recent_fills_live":
-        result = get_recent_fills_live(
-            tool_input.get("address"),
-            tool_input.get("limit", 20)
-        )
-    elif tool_name == "get_asset_info":
-        result = get_asset_info(tool_input.get("asset", ""))
-    else:
-        result = {"error": f"Unknown tool: {tool_name}"}
-
-    return json.dumps(result, indent=2)
-
-
-# ============================================================================
-# API ROUTES
-# ============================================================================
-
-@ai_bp.route('/settings', methods=['GET'])
-def get_settings():
-    """Get current AI settings"""
-    settings = load_settings()
-    api_key = settings.get('anthropic_api_key', '')
-    if api_key:
-        masked = api_key[:10] + '...' + api_key[-4:] if len(api_key) > 14 else '***'
-    else:
-        masked = ''
-
-    return jsonify({
-        'has_api_key': bool(api_key),
-        'api_key_masked': masked,
-        'model': settings.get('model', 'claude-sonnet-4-20250514')
-    })
-
-
-@ai_bp.route('/settings', methods=['POST'])
-def update_settings():
-    """Update AI settings"""
-    data = request.json
-    settings = load_settings()
-
-    if 'anthropic_api_key' in data:
-        settings['anthropic_api_key'] = data['anthropic_api_key']
-    if 'model' in data:
-        settings['model'] = data['model']
-
-    save_settings(settings)
-    return jsonify({'success': True})
-
-
-@ai_bp.route('/chat', methods=['POST'])
-def chat():
-    """Chat with Claude"""
-    settings = load_settings()
-    api_key = settings.get('anthropic_api_key')
-
-    if not api_key:
-        return jsonify({'error': 'No API key configured. Go to Settings (gear icon) to add your Anthropic API key.'}), 400
-
-    data = request.json
-    user_message = data.get('message', '')
-    conversation_history = data.get('history', [])
-
-    if not user_message:
-        return jsonify({'error': 'No message provided'}), 400
-
-    try:
-        client = anthropic.Anthropic(api_key=api_key)
-        messages = conversation_history + [{"role": "user", "content": user_message}]
-
-        system_prompt = """You are an AI assistant for a Hyperliquid trading bot dashboard. You help users:
+SYSTEM_PROMPT = """You are an AI assistant for a Hyperliquid trading bot dashboard. You help users:
 
 1. CREATE new trading bot configs by looking up market info (tick sizes, decimals, spot coin IDs)
 2. ANALYZE trading performance and suggest parameter improvements
@@ -1075,27 +1260,317 @@ When asked to create a config, follow these steps:
 5. Use propose_new_config to show it to the user
 6. Explain what each key setting does"""
 
+# System prompt as a content block list with cache_control so the whole
+# static prefix is served from the prompt cache after the first request
+SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": SYSTEM_PROMPT,
+    "cache_control": {"type": "ephemeral"},
+}]
+
+
+# Tool name -> input unpacker; O(1) lookup instead of a 13-branch elif
+# chain on the hot path (runs once per tool block in every chat turn)
+TOOL_DISPATCH = {
+    "get_market_info": lambda i: get_market_info(i.get("symbol", "")),
+    "get_spot_coin_id": lambda i: get_spot_coin_id(i.get("symbol", "")),
+    "read_config": lambda i: read_config(i.get("filename", "")),
+    "list_configs": lambda i: list_configs(),
+    "get_performance_metrics": lambda i: get_performance_metrics(
+        i.get("config_filename", ""),
+        i.get("window", "24h")
+    ),
+    "propose_new_config": lambda i: propose_new_config(
+        i.get("config", {}),
+        i.get("filename", ""),
+        i.get("description", "")
+    ),
+    "propose_config_changes": lambda i: propose_config_changes(
+        i.get("filename", ""),
+        i.get("changes", {}),
+        i.get("reason", "")
+    ),
+    "get_account_balances": lambda i: get_account_balances(i.get("address")),
+    "get_open_positions": lambda i: get_open_positions(i.get("address")),
+    "get_open_orders": lambda i: get_open_orders(i.get("address")),
+    "get_current_prices": lambda i: get_current_prices(i.get("symbols")),
+    "get_recent_fills_live": lambda i: get_recent_fills_live(
+        i.get("address"),
+        i.get("limit", 20)
+    ),
+    "get_asset_info": lambda i: get_asset_info(i.get("asset", "")),
+}
+
+# Expected input field types per tool, checked before dispatch so malformed
+# tool calls fail fast with a structured error instead of burning a
+# Hyperliquid round-trip that was always going to fail downstream
+TOOL_INPUT_TYPES = {
+    "get_market_info": {"symbol": str},
+    "get_spot_coin_id": {"symbol": str},
+    "read_config": {"filename": str},
+    "list_configs": {},
+    "get_performance_metrics": {"config_filename": str, "window": str},
+    "propose_new_config": {"config": dict, "filename": str, "description": str},
+    "propose_config_changes": {"filename": str, "changes": dict, "reason": str},
+    "get_account_balances": {"address": str},
+    "get_open_positions": {"address": str},
+    "get_open_orders": {"address": str},
+    "get_current_prices": {"symbols": list},
+    "get_recent_fills_live": {"address": str, "limit": int},
+    "get_asset_info": {"asset": str},
+}
+
+
+def _validate_tool_input(tool_name: str, tool_input: dict):
+    """Return an error string for malformed tool input, else None"""
+    if not isinstance(tool_input, dict):
+        return "tool input must be an object"
+    expected = TOOL_INPUT_TYPES.get(tool_name)
+    if expected is None:
+        return None
+    for field, ftype in expected.items():
+        value = tool_input.get(field)
+        if value is not None and not isinstance(value, ftype):
+            return f"'{field}' must be a {ftype.__name__}"
+    return None
+
+
+# Serialized tool results cached by (tool name, normalized input). Within a
+# conversation Claude often re-calls the same tool with the same arguments;
+# within these TTLs the answer hasn't changed, so skip the network round-trip.
+# Proposals and config reads are never cached (side effects / must hit disk).
+TOOL_RESULT_TTLS = {
+    "get_current_prices": 5,
+    "get_open_orders": 5,
+    "get_account_balances": 60,
+    "get_open_positions": 60,
+    "get_market_info": 3600,
+    "get_spot_coin_id": 3600,
+    "get_asset_info": 3600,
+}
+TOOL_CACHE_MAX = 2048
+
+# { sha256 hexdigest: (result_json, expiry_time) } - same shape as the
+# cached_info module cache
+_tool_cache = {}
+_tool_cache_lock = threading.Lock()
+
+
+def _tool_cache_key(tool_name: str, tool_input: dict) -> str:
+    """Content-addressable key over the tool name and sorted input"""
+    raw = tool_name + json.dumps(tool_input, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _dumps_compact(result) -> str:
+    """Compact JSON for tool results (whitespace is billed prompt tokens)"""
+    if orjson is not None:
+        return orjson.dumps(result).decode()
+    return json.dumps(result, separators=(',', ':'))
+
+
+def execute_tool(tool_name: str, tool_input: dict) -> str:
+    """Execute a tool and return the result"""
+    error = _validate_tool_input(tool_name, tool_input)
+    if error is not None:
+        return _dumps_compact({"error": f"Invalid input for {tool_name}: {error}"})
+
+    ttl = TOOL_RESULT_TTLS.get(tool_name)
+    key = _tool_cache_key(tool_name, tool_input) if ttl else None
+    if key is not None:
+        now = time.time()
+        with _tool_cache_lock:
+            hit = _tool_cache.get(key)
+            if hit is not None and now < hit[1]:
+                return hit[0]
+
+    fn = TOOL_DISPATCH.get(tool_name)
+    if fn is not None:
+        result = fn(tool_input)
+    else:
+        result = {"error": f"Unknown tool: {tool_name}"}
+
+    out = _dumps_compact(result)
+    if key is not None:
+        with _tool_cache_lock:
+            while len(_tool_cache) >= TOOL_CACHE_MAX:
+                _tool_cache.pop(next(iter(_tool_cache)))
+            _tool_cache[key] = (out, time.time() + ttl)
+    return out
+
+
+# ============================================================================
+# API ROUTES
+# ============================================================================
+
+@ai_bp.route('/settings', methods=['GET'])
+def get_settings():
+    """Get current AI settings"""
+    settings = load_settings()
+    api_key = settings.get('anthropic_api_key', '')
+    if api_key:
+        masked = api_key[:10] + '...' + api_key[-4:] if len(api_key) > 14 else '***'
+    else:
+        masked = ''
+
+    return jsonify({
+        'has_api_key': bool(api_key),
+        'api_key_masked': masked,
+        'model': settings.get('model', 'claude-sonnet-4-20250514')
+    })
+
+
+@ai_bp.route('/settings', methods=['POST'])
+def update_settings():
+    """Update AI settings"""
+    data = request.json
+    settings = load_settings()
+
+    if 'anthropic_api_key' in data:
+        settings['anthropic_api_key'] = data['anthropic_api_key']
+    if 'model' in data:
+        settings['model'] = data['model']
+
+    save_settings(settings)
+    return jsonify({'success': True})
+
+
+# Hard cap on tool-use round trips per chat request: each iteration is a
+# billed messages.create call, so a model stuck asking for tools would
+# otherwise burn unbounded latency and cost
+MAX_TOOL_ITERATIONS = 8
+
+
+def _sse(payload) -> str:
+    """Format one payload as a Server-Sent Events data frame"""
+    body = orjson.dumps(payload).decode() if orjson is not None else json.dumps(payload)
+    return f"data: {body}\n\n"
+
+
+def _chat_stream(client, model, messages):
+    """Run the tool loop, yielding SSE frames as work happens: text deltas
+    while Claude writes, tool-name heartbeats while tools run, and a final
+    done frame carrying any pending actions"""
+    anthropic = _anthropic()
+    try:
+        for _ in range(MAX_TOOL_ITERATIONS):
+            with client.messages.stream(
+                model=model,
+                max_tokens=4096,
+                system=SYSTEM_BLOCKS,
+                tools=TOOLS,
+                messages=messages
+            ) as stream:
+                for text in stream.text_stream:
+                    yield _sse({'delta': text})
+                response = stream.get_final_message()
+
+            if response.stop_reason != "tool_use":
+                break
+
+            assistant_content = response.content
+            pending_tools = [
+                (block, _TOOL_EXECUTOR.submit(execute_tool, block.name, block.input))
+                for block in assistant_content
+                if block.type == "tool_use"
+            ]
+            if not pending_tools:
+                # stop_reason claimed tool_use but no tool blocks arrived;
+                # calling the API again with an empty user turn would fail
+                break
+            for block, _ in pending_tools:
+                yield _sse({'tool': block.name})
+            tool_results = [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": future.result()
+                }
+                for block, future in pending_tools
+            ]
+
+            messages.append({"role": "assistant", "content": assistant_content})
+            messages.append({"role": "user", "content": tool_results})
+        else:
+            yield _sse({'error': f'Stopped after {MAX_TOOL_ITERATIONS} tool iterations without a final answer'})
+            return
+
+        yield _sse({'done': True, 'pending_actions': pending_actions.tail(5)})
+
+    except anthropic.APIError as e:
+        yield _sse({'error': f'API error: {str(e)}'})
+    except Exception as e:
+        yield _sse({'error': f'Error: {str(e)}'})
+
+
+@ai_bp.route('/chat', methods=['POST'])
+def chat():
+    """Chat with Claude. Pass "stream": true to get Server-Sent Events
+    (text deltas + tool heartbeats) instead of one buffered JSON reply."""
+    settings = load_settings()
+    api_key = settings.get('anthropic_api_key')
+
+    if not api_key:
+        return jsonify({'error': 'No API key configured. Go to Settings (gear icon) to add your Anthropic API key.'}), 400
+
+    data = request.json
+    user_message = data.get('message', '')
+    conversation_history = data.get('history', [])
+
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    if data.get('stream'):
+        client = get_client(api_key)
+        messages = conversation_history + [{"role": "user", "content": user_message}]
+        return Response(
+            _chat_stream(client, settings.get('model', 'claude-sonnet-4-20250514'), messages),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    anthropic = _anthropic()
+    try:
+        client = get_client(api_key)
+        messages = conversation_history + [{"role": "user", "content": user_message}]
+
         response = client.messages.create(
             model=settings.get('model', 'claude-sonnet-4-20250514'),
             max_tokens=4096,
-            system=system_prompt,
+            system=SYSTEM_BLOCKS,
             tools=TOOLS,
             messages=messages
         )
 
-        # Handle tool use loop
-        while response.stop_reason == "tool_use":
-            tool_results = []
-            assistant_content = response.content
+        # Handle tool use loop (bounded: every iteration is a billed API
+        # round trip, so a model stuck on tools can't run away)
+        for _ in range(MAX_TOOL_ITERATIONS):
+            if response.stop_reason != "tool_use":
+                break
 
-            for block in response.content:
-                if block.type == "tool_use":
-                    tool_result = execute_tool(block.name, block.input)
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": tool_result
-                    })
+            # Single pass over the content blocks: stash them for the
+            # conversation transcript and schedule tool calls as we go.
+            # Claude often emits several independent tool calls in one turn;
+            # run them concurrently so the turn costs ~the slowest call
+            assistant_content = response.content
+            pending_tools = [
+                (block, _TOOL_EXECUTOR.submit(execute_tool, block.name, block.input))
+                for block in assistant_content
+                if block.type == "tool_use"
+            ]
+            if not pending_tools:
+                # stop_reason claimed tool_use but no tool blocks arrived;
+                # calling the API again with an empty user turn would fail
+                break
+
+            tool_results = [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": future.result()
+                }
+                for block, future in pending_tools
+            ]
 
             messages.append({"role": "assistant", "content": assistant_content})
             messages.append({"role": "user", "content": tool_results})
@@ -1103,21 +1578,24 @@ When asked to create a config, follow these steps:
             response = client.messages.create(
                 model=settings.get('model', 'claude-sonnet-4-20250514'),
                 max_tokens=4096,
-                system=system_prompt,
+                system=SYSTEM_BLOCKS,
                 tools=TOOLS,
                 messages=messages
             )
 
+        if response.stop_reason == "tool_use":
+            return jsonify({
+                'error': f'Stopped after {MAX_TOOL_ITERATIONS} tool iterations without a final answer'
+            }), 500
+
         response_text = ""
         for block in response.content:
             if hasattr(block, 'text'):
                 response_text += block.text
 
-        pending = [v for v in pending_actions.values()]
-
         return jsonify({
             'response': response_text,
-            'pending_actions': pending[-5:] if pending else []
+            'pending_actions': pending_actions.tail(5)
         })
 
     except anthropic.APIError as e:
@@ -1140,8 +1618,7 @@ def confirm_action():
     try:
         if action['type'] == 'create_config':
             filepath = os.path.join(CONFIG_DIR, action['filename'])
-            with open(filepath, 'w') as f:
-                json.dump(action['config'], f, indent=2)
+            _write_config_atomic(filepath, action['config'])
 
             return jsonify({
                 'success': True,
@@ -1151,25 +1628,29 @@ def confirm_action():
 
         elif action['type'] == 'modify_config':
             filepath = os.path.join(CONFIG_DIR, action['filename'])
-
-            with open(filepath, 'r') as f:
-                config = json.load(f)
+            config = _load_json(filepath)
 
             def deep_merge(base, changes):
-                for key, value in changes.items():
-                    if isinstance(value, dict) and key in base and isinstance(base[key], dict):
-                        deep_merge(base[key], value)
-                    else:
-                        base[key] = value
+                # Iterative (stack-based) merge: same semantics as the
+                # recursive version without per-level call frames or a
+                # recursion limit on pathological inputs
+                stack = [(base, changes)]
+                while stack:
+                    b, c = stack.pop()
+                    for key, value in c.items():
+                        if isinstance(value, dict) and key in b and isinstance(b[key], dict):
+                            stack.append((b[key], value))
+                        else:
+                            b[key] = value
 
             deep_merge(config, action['changes'])
 
-            with open(filepath, 'w') as f:
-                json.dump(config, f, indent=2)
+            wrote = _write_config_atomic(filepath, config)
 
             return jsonify({
                 'success': True,
-                'message': f"Updated {action['filename']}",
+                'message': (f"Updated {action['filename']}" if wrote
+                            else f"{action['filename']} already up to date"),
                 'filepath': filepath
             })
 
@@ -1403,10 +1884,27 @@ SETTINGS_PAGE_HTML = """
 </html>
 """
 
+# The page is fully static (no template variables), so hash it once at
+# import and serve it with conditional-request support instead of running
+# it through Jinja on every GET
+_SETTINGS_PAGE_ETAG = '"' + hashlib.sha1(SETTINGS_PAGE_HTML.encode()).hexdigest()[:16] + '"'
+
+
+def _static_html_response(html: str, etag: str):
+    """Serve a static HTML string with ETag/304 handling"""
+    if request.headers.get('If-None-Match') == etag:
+        response = Response(status=304)
+    else:
+        response = Response(html, mimetype='text/html')
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
 @ai_bp.route('/')
 def settings_page():
     """Render the settings page"""
-    return render_template_string(SETTINGS_PAGE_HTML)
+    return _static_html_response(SETTINGS_PAGE_HTML, _SETTINGS_PAGE_ETAG)
 
 
 # ============================================================================
@@ -1414,8 +1912,9 @@ def settings_page():
 # This HTML/CSS/JS can be injected into any page
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
 def get_chat_panel_html():
-    """Returns the HTML/CSS/JS for the slide-out chat panel"""
+    """Returns the HTML/CSS/JS for the slide-out chat panel (built once)"""
     return """
 <!-- AI Chat Panel Toggle Button -->
 <button id="aiChatToggle" onclick="toggleAiChat()" title="AI Assistant">
@@ -1434,7 +1933,8 @@ def get_chat_panel_html():
     </div>
 
     <div class="ai-chat-messages" id="aiChatMessages">
-        <div class="ai-message ai-system">
+        <button id="aiLoadEarlier" class="ai-load-earlier" onclick="loadEarlierAiMessages()" style="display:none">Load earlier messages</button>
+        <div id="aiChatHint" class="ai-message ai-system">
             I can help you create configs and analyze your strategies. Try:
             <br>• "Create a perp config for HYPE"
             <br>• "What's the tick size for BTC?"
@@ -1450,7 +1950,12 @@ def get_chat_panel_html():
     </div>
 </div>
 
-<style>
+
+<script>
+// Panel CSS is parsed once per document and shared by reference: a
+// constructed stylesheet adopted onto the document, with a guarded
+// <style> element fallback for browsers without adoptedStyleSheets
+const AI_CHAT_CSS = `
 /* Chat Toggle Button */
 #aiChatToggle {
     position: fixed;
@@ -1480,7 +1985,7 @@ def get_chat_panel_html():
 .ai-chat-panel {
     position: fixed;
     top: 0;
-    right: -420px;
+    right: 0;
     width: 400px;
     height: 100vh;
     background: linear-gradient(180deg, #0d0d15 0%, #1a1a2e 100%);
@@ -1488,11 +1993,15 @@ def get_chat_panel_html():
     display: flex;
     flex-direction: column;
     z-index: 9999;
-    transition: right 0.3s ease;
+    /* Animate transform, not right: the slide runs on the compositor
+       instead of re-laying-out a 400px x 100vh strip every frame */
+    transform: translateX(110%);
+    transition: transform 0.3s ease;
+    will-change: transform;
     box-shadow: -5px 0 30px rgba(0, 0, 0, 0.5);
 }
 .ai-chat-panel.open {
-    right: 0;
+    transform: translateX(0);
 }
 
 .ai-chat-header {
@@ -1715,11 +2224,16 @@ def get_chat_panel_html():
     background: #6366f1;
     border-radius: 50%;
     animation: aiPulse 1.5s ease-in-out infinite;
+    will-change: transform, opacity;
 }
 @keyframes aiPulse {
     0%, 100% { opacity: 0.4; transform: scale(0.8); }
     50% { opacity: 1; transform: scale(1.2); }
 }
+.ai-thinking-status {
+    color: #888;
+    font-size: 0.8rem;
+}
 .ai-thinking-dots {
     display: inline-flex;
     gap: 3px;
@@ -1731,6 +2245,7 @@ def get_chat_panel_html():
     background: #6366f1;
     border-radius: 50%;
     animation: aiDotBounce 1.4s ease-in-out infinite;
+    will-change: transform, opacity;
 }
 .ai-thinking-dots span:nth-child(2) { animation-delay: 0.2s; }
 .ai-thinking-dots span:nth-child(3) { animation-delay: 0.4s; }
@@ -1739,6 +2254,19 @@ def get_chat_panel_html():
     40% { opacity: 1; transform: translateY(-4px); }
 }
 
+/* Load-earlier button (DOM windowing) */
+.ai-load-earlier {
+    align-self: center;
+    background: rgba(99, 102, 241, 0.15);
+    border: 1px solid rgba(99, 102, 241, 0.3);
+    border-radius: 12px;
+    color: #a5b4fc;
+    font-size: 0.8rem;
+    padding: 4px 12px;
+    cursor: pointer;
+}
+.ai-load-earlier:hover { background: rgba(99, 102, 241, 0.3); }
+
 /* Clear chat button */
 .ai-clear-btn {
     background: none;
@@ -1751,29 +2279,128 @@ def get_chat_panel_html():
     border-radius: 4px;
 }
 .ai-clear-btn:hover { color: #f87171; background: rgba(248, 113, 113, 0.1); }
-</style>
+`;
+
+(function injectAiChatStyles() {
+    if (document.adoptedStyleSheets !== undefined &&
+            typeof CSSStyleSheet !== 'undefined' &&
+            CSSStyleSheet.prototype.replaceSync) {
+        if (!window.__aiChatSheet) {
+            const sheet = new CSSStyleSheet();
+            sheet.replaceSync(AI_CHAT_CSS);
+            window.__aiChatSheet = sheet;
+        }
+        if (!document.adoptedStyleSheets.includes(window.__aiChatSheet)) {
+            document.adoptedStyleSheets = [...document.adoptedStyleSheets, window.__aiChatSheet];
+        }
+    } else if (!document.getElementById('ai-chat-styles')) {
+        const styleEl = document.createElement('style');
+        styleEl.id = 'ai-chat-styles';
+        styleEl.textContent = AI_CHAT_CSS;
+        document.head.appendChild(styleEl);
+    }
+})();
 
-<script>
 // AI Chat State
 let aiChatHistory = [];
 let aiIsLoading = false;
 let aiThinkingEl = null;
 
+// DOM windowing: keep at most this many message nodes mounted so append
+// and scroll cost stay constant however long the session runs. The full
+// transcript lives in aiChatHistory; older messages re-mount on demand.
+const MAX_DOM_MESSAGES = 50;
+let aiRenderStart = 0;  // index into aiChatHistory of the earliest mounted entry
+
+// Markdown regexes compiled once; each message is converted exactly once
+// and the result cached on its history entry, so windowed re-mounts and
+// restores reuse the rendered HTML instead of re-running the regexes
+const RE_FENCE = /```(\\w*)\\n([\\s\\S]*?)```/g;
+const RE_INLINE_CODE = /`([^`]+)`/g;
+const RE_NEWLINE = /\\n/g;
+
+function renderMarkdown(content) {
+    return content
+        .replace(RE_FENCE, '<pre><code>$2</code></pre>')
+        .replace(RE_INLINE_CODE, '<code>$1</code>')
+        .replace(RE_NEWLINE, '<br>');
+}
+
+function buildAiMessageEl(role, html) {
+    const msgEl = document.createElement('div');
+    msgEl.className = 'ai-message ai-' + role;
+    msgEl.innerHTML = html;
+    return msgEl;
+}
+
+function mountHistoryEntry(entry, frag) {
+    if (entry.html === undefined) entry.html = renderMarkdown(entry.content);
+    const el = buildAiMessageEl(entry.role, entry.html);
+    el.classList.add('ai-history');
+    frag.appendChild(el);
+}
+
+function updateAiLoadEarlier() {
+    const btn = document.getElementById('aiLoadEarlier');
+    if (btn) btn.style.display = aiRenderStart > 0 ? 'block' : 'none';
+}
+
+function pruneAiMessages(messagesEl) {
+    const nodes = messagesEl.querySelectorAll('.ai-message');
+    let excess = nodes.length - MAX_DOM_MESSAGES;
+    for (let i = 0; excess > 0 && i < nodes.length; i++) {
+        if (nodes[i].id === 'aiChatHint') continue;  // pinned usage hint
+        nodes[i].remove();
+        excess--;
+        // Only history-backed bubbles advance the window pointer; error and
+        // system bubbles are mounted without ever entering aiChatHistory
+        if (nodes[i].classList.contains('ai-history') &&
+            aiRenderStart < aiChatHistory.length) aiRenderStart++;
+    }
+    updateAiLoadEarlier();
+}
+
+function loadEarlierAiMessages() {
+    const messagesEl = document.getElementById('aiChatMessages');
+    const btn = document.getElementById('aiLoadEarlier');
+    const start = Math.max(0, aiRenderStart - MAX_DOM_MESSAGES);
+    const frag = document.createDocumentFragment();
+    for (let i = start; i < aiRenderStart; i++) {
+        mountHistoryEntry(aiChatHistory[i], frag);
+    }
+    messagesEl.insertBefore(frag, btn.nextSibling);
+    aiRenderStart = start;
+    updateAiLoadEarlier();
+}
+
 // ---- Persistence via sessionStorage ----
 const AI_STORAGE_KEY = 'perplobster_ai_chat';
 
 function saveAiState() {
-    const messagesEl = document.getElementById('aiChatMessages');
-    // Save history and rendered HTML (excluding thinking bubble)
-    const clone = messagesEl.cloneNode(true);
-    const thinking = clone.querySelector('.ai-thinking');
-    if (thinking) thinking.remove();
-    sessionStorage.setItem(AI_STORAGE_KEY, JSON.stringify({
-        history: aiChatHistory,
-        html: clone.innerHTML
-    }));
+    // History entries carry their rendered html, so persistence is one
+    // stringify - no DOM cloning or traversal
+    sessionStorage.setItem(AI_STORAGE_KEY, JSON.stringify({ history: aiChatHistory }));
+}
+
+// Coalesce persistence: a burst of messages collapses into one
+// sessionStorage write instead of a synchronous stringify per message
+let aiSaveHandle = null;
+
+function flushAiState() {
+    if (aiSaveHandle !== null) {
+        clearTimeout(aiSaveHandle);
+        aiSaveHandle = null;
+    }
+    saveAiState();
 }
 
+function scheduleSaveAiState() {
+    if (aiSaveHandle !== null) return;
+    aiSaveHandle = setTimeout(flushAiState, 250);
+}
+
+window.addEventListener('beforeunload', flushAiState);
+
 function restoreAiState() {
     try {
         const saved = sessionStorage.getItem(AI_STORAGE_KEY);
@@ -1782,7 +2409,14 @@ function restoreAiState() {
         if (state.history && state.history.length > 0) {
             aiChatHistory = state.history;
             const messagesEl = document.getElementById('aiChatMessages');
-            messagesEl.innerHTML = state.html;
+            // Mount only the last window of the transcript in one batch
+            aiRenderStart = Math.max(0, aiChatHistory.length - MAX_DOM_MESSAGES);
+            const frag = document.createDocumentFragment();
+            for (let i = aiRenderStart; i < aiChatHistory.length; i++) {
+                mountHistoryEntry(aiChatHistory[i], frag);
+            }
+            messagesEl.appendChild(frag);
+            updateAiLoadEarlier();
             messagesEl.scrollTop = messagesEl.scrollHeight;
             return true;
         }
@@ -1792,10 +2426,12 @@ function restoreAiState() {
 
 function clearAiChat() {
     aiChatHistory = [];
+    aiRenderStart = 0;
     sessionStorage.removeItem(AI_STORAGE_KEY);
     const messagesEl = document.getElementById('aiChatMessages');
     messagesEl.innerHTML = `
-        <div class="ai-message ai-system">
+        <button id="aiLoadEarlier" class="ai-load-earlier" onclick="loadEarlierAiMessages()" style="display:none">Load earlier messages</button>
+        <div id="aiChatHint" class="ai-message ai-system">
             I can help you create configs and analyze your strategies. Try:
             <br>• "Create a perp config for HYPE"
             <br>• "What's the tick size for BTC?"
@@ -1814,6 +2450,7 @@ function showAiThinking() {
             <div class="ai-pulse"></div>
             Thinking<span class="ai-thinking-dots"><span></span><span></span><span></span></span>
         </div>
+        <div class="ai-thinking-status" id="aiThinkingStatus"></div>
     `;
     messagesEl.appendChild(aiThinkingEl);
     messagesEl.scrollTop = messagesEl.scrollHeight;
@@ -1836,21 +2473,14 @@ function toggleAiChat() {
 
 function addAiMessage(role, content) {
     const messagesEl = document.getElementById('aiChatMessages');
-    const msgEl = document.createElement('div');
-    msgEl.className = 'ai-message ai-' + role;
-
-    // Convert markdown code blocks
-    let html = content;
-    html = html.replace(/```(\\w*)\\n([\\s\\S]*?)```/g, '<pre><code>$2</code></pre>');
-    html = html.replace(/`([^`]+)`/g, '<code>$1</code>');
-    html = html.replace(/\\n/g, '<br>');
-
-    msgEl.innerHTML = html;
+    const msgEl = buildAiMessageEl(role, renderMarkdown(content));
     messagesEl.appendChild(msgEl);
+    pruneAiMessages(messagesEl);
     messagesEl.scrollTop = messagesEl.scrollHeight;
 
-    // Persist after each message
-    saveAiState();
+    // Persist after each message (debounced)
+    scheduleSaveAiState();
+    return msgEl;
 }
 
 async function sendAiMessage() {
@@ -1860,7 +2490,7 @@ async function sendAiMessage() {
     const message = input.value.trim();
     if (!message) return;
 
-    addAiMessage('user', message);
+    const userEl = addAiMessage('user', message);
     input.value = '';
 
     aiIsLoading = true;
@@ -1877,52 +2507,142 @@ async function sendAiMessage() {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 message: message,
-                history: aiChatHistory
+                stream: true,
+                // The API only accepts role/content; strip the cached html
+                history: aiChatHistory.map(e => ({ role: e.role, content: e.content }))
             })
         });
 
-        const data = await resp.json();
+        if (!resp.ok || !(resp.headers.get('Content-Type') || '').includes('text/event-stream')) {
+            // Validation failures (no API key, empty message) still come back as JSON
+            const data = await resp.json();
+            hideAiThinking();
+            addAiMessage('error', data.error || 'Request failed');
+            return;
+        }
 
-        // Remove thinking indicator
-        hideAiThinking();
+        const messagesEl = document.getElementById('aiChatMessages');
+        let msgEl = null;           // assistant bubble, created on first delta
+        let assistantText = '';
 
-        if (data.error) {
-            addAiMessage('error', data.error);
-        } else {
-            aiChatHistory.push({ role: 'user', content: message });
-            aiChatHistory.push({ role: 'assistant', content: data.response });
-            addAiMessage('assistant', data.response);
-
-            if (data.pending_actions && data.pending_actions.length > 0) {
-                renderAiPendingActions(data.pending_actions);
+        const handleAiEvent = (evt) => {
+            if (evt.delta !== undefined) {
+                hideAiThinking();
+                if (!msgEl) {
+                    msgEl = buildAiMessageEl('assistant', '');
+                    messagesEl.appendChild(msgEl);
+                }
+                assistantText += evt.delta;
+                // Plain text during streaming; markdown runs once at the end
+                msgEl.insertAdjacentText('beforeend', evt.delta);
+                messagesEl.scrollTop = messagesEl.scrollHeight;
+            } else if (evt.tool) {
+                if (!aiThinkingEl) showAiThinking();
+                const status = document.getElementById('aiThinkingStatus');
+                if (status) status.textContent = 'calling ' + evt.tool + '…';
+            } else if (evt.error) {
+                hideAiThinking();
+                addAiMessage('error', evt.error);
+            } else if (evt.done) {
+                if (msgEl) {
+                    msgEl.innerHTML = renderMarkdown(assistantText);
+                    msgEl.classList.add('ai-history');
+                }
+                userEl.classList.add('ai-history');
+                aiChatHistory.push({ role: 'user', content: message, html: userEl.innerHTML });
+                aiChatHistory.push({
+                    role: 'assistant',
+                    content: assistantText,
+                    html: renderMarkdown(assistantText)
+                });
+                pruneAiMessages(messagesEl);
+                scheduleSaveAiState();
+                if (evt.pending_actions && evt.pending_actions.length > 0) {
+                    renderAiPendingActions(evt.pending_actions);
+                }
+            }
+        };
+
+        const reader = resp.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let sep;
+            while ((sep = buffer.indexOf('\\n\\n')) !== -1) {
+                const frame = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+                if (frame.startsWith('data: ')) {
+                    handleAiEvent(JSON.parse(frame.slice(6)));
+                }
             }
         }
     } catch (e) {
-        hideAiThinking();
         addAiMessage('error', 'Failed to send: ' + e.message);
     } finally {
+        hideAiThinking();
         aiIsLoading = false;
         btn.disabled = false;
         btn.innerHTML = 'Send';
     }
 }
 
+// Keyed render: rows are reconciled by action_id so each poll only adds or
+// removes what changed, instead of rebuilding every row's innerHTML (which
+// also interpolated filename into markup - building nodes with textContent
+// closes that injection hole)
+const aiPendingNodes = new Map();
+
+function buildAiPendingNode(a) {
+    const row = document.createElement('div');
+    row.className = 'ai-pending-action';
+
+    const title = document.createElement('h4');
+    title.textContent = (a.type === 'create_config' ? '📄 Create: ' : '✏️ Modify: ') + a.filename;
+
+    const actions = document.createElement('div');
+    actions.className = 'actions';
+
+    // No per-button listeners: clicks bubble to the single delegated
+    // handler on the container, keyed off these data attributes
+    const confirmBtn = document.createElement('button');
+    confirmBtn.className = 'confirm';
+    confirmBtn.textContent = '✓ Confirm';
+    confirmBtn.dataset.action = 'confirm';
+    confirmBtn.dataset.actionId = a.action_id;
+
+    const cancelBtn = document.createElement('button');
+    cancelBtn.className = 'cancel';
+    cancelBtn.textContent = '✗ Cancel';
+    cancelBtn.dataset.action = 'cancel';
+    cancelBtn.dataset.actionId = a.action_id;
+
+    actions.appendChild(confirmBtn);
+    actions.appendChild(cancelBtn);
+    row.appendChild(title);
+    row.appendChild(actions);
+    return row;
+}
+
 function renderAiPendingActions(actions) {
     const container = document.getElementById('aiPendingActions');
-    if (!actions || actions.length === 0) {
-        container.innerHTML = '';
-        return;
-    }
+    const incoming = new Set((actions || []).map(a => a.action_id));
 
-    container.innerHTML = actions.map(a => `
-        <div class="ai-pending-action">
-            <h4>${a.type === 'create_config' ? '📄 Create' : '✏️ Modify'}: ${a.filename}</h4>
-            <div class="actions">
-                <button class="confirm" onclick="confirmAiAction('${a.action_id}')">✓ Confirm</button>
-                <button class="cancel" onclick="cancelAiAction('${a.action_id}')">✗ Cancel</button>
-            </div>
-        </div>
-    `).join('');
+    for (const [id, node] of aiPendingNodes) {
+        if (!incoming.has(id)) {
+            node.remove();
+            aiPendingNodes.delete(id);
+        }
+    }
+    for (const a of (actions || [])) {
+        if (!aiPendingNodes.has(a.action_id)) {
+            const node = buildAiPendingNode(a);
+            aiPendingNodes.set(a.action_id, node);
+            container.appendChild(node);
+        }
+    }
 }
 
 async function confirmAiAction(actionId) {
@@ -1963,6 +2683,18 @@ async function fetchAiPendingActions() {
     } catch (e) {}
 }
 
+// One delegated listener serves every confirm/cancel button, however many
+// actions are queued
+document.getElementById('aiPendingActions').addEventListener('click', function(e) {
+    const btn = e.target.closest('button[data-action]');
+    if (!btn) return;
+    if (btn.dataset.action === 'confirm') {
+        confirmAiAction(btn.dataset.actionId);
+    } else {
+        cancelAiAction(btn.dataset.actionId);
+    }
+});
+
 // Handle Enter key
 document.getElementById('aiChatInput').addEventListener('keydown', function(e) {
     if (e.key === 'Enter' && !e.shiftKey) {
@@ -1978,8 +2710,13 @@ fetchAiPendingActions();
 """
 
 
+@functools.lru_cache(maxsize=1)
+def _chat_panel_etag():
+    return '"' + hashlib.sha1(get_chat_panel_html().encode()).hexdigest()[:16] + '"'
+
+
 # Route to get the chat panel HTML (for AJAX injection)
 @ai_bp.route('/chat-panel')
 def chat_panel():
     """Return the chat panel HTML for injection into other pages"""
-    return get_chat_panel_html()
\ No newline at end of file
+    return _static_html_response(get_chat_panel_html(), _chat_panel_etag())
\ No newline at end of file
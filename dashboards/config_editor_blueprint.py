@@ -38,57 +38,106 @@ def create_config_editor_blueprint(config_dir: str, examples_dir: str, bots_dir:
     # HELPERS
     # ========================================================================
 
+    # Parsed config lists cached against an mtime signature of the
+    # directory listing, with per-file reparse of only the entries whose
+    # mtime changed. Saves/deletes through this blueprint bump mtimes, so
+    # invalidation is automatic; the steady-state page load is a handful
+    # of stat calls instead of N opens + JSON parses.
+    _configs_cache = {'sig': None, 'data': []}
+    _configs_file_cache = {}  # filename -> (mtime_ns, entry or None)
+    _examples_cache = {'sig': None, 'data': []}
+
+    def _build_config_entry(filename: str, filepath: str):
+        """Parse one config file into a list entry (None if not a bot config)"""
+        try:
+            with open(filepath, 'r') as f:
+                config = json.load(f)
+
+            # Determine type
+            if 'pair' in config:
+                config_type = 'spot'
+                name = config['pair']
+            elif 'grid' in config:
+                config_type = 'grid'
+                name = config.get('market', filename)
+            elif 'market' in config:
+                config_type = 'perp'
+                name = f"{config['market']}-PERP"
+            else:
+                return None
+
+            return {
+                'filename': filename,
+                'filepath': filepath,
+                'name': name,
+                'type': config_type,
+                'description': config.get('description', ''),
+                'config': config
+            }
+        except Exception as e:
+            print(f"Error loading {filename}: {e}")
+            return None
+
     def get_all_configs() -> list:
-        """Get all config files from config directory"""
-        configs = []
+        """Get all config files from config directory (cached by mtime)"""
         if not os.path.exists(config_dir):
-            return configs
+            return []
 
-        for filename in os.listdir(config_dir):
-            if not filename.endswith('.json') or filename == 'config.json':
-                continue
-            filepath = os.path.join(config_dir, filename)
-            try:
-                with open(filepath, 'r') as f:
-                    config = json.load(f)
+        try:
+            listing = [
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(config_dir)
+                if entry.name.endswith('.json') and entry.name != 'config.json'
+            ]
+        except OSError:
+            return []
+
+        sig = tuple(sorted(listing))
+        if sig == _configs_cache['sig']:
+            return _configs_cache['data']
 
-                # Determine type
-                if 'pair' in config:
-                    config_type = 'spot'
-                    name = config['pair']
-                elif 'grid' in config:
-                    config_type = 'grid'
-                    name = config.get('market', filename)
-                elif 'market' in config:
-                    config_type = 'perp'
-                    name = f"{config['market']}-PERP"
-                else:
-                    continue
+        configs = []
+        seen = set()
+        for filename, mtime in listing:
+            seen.add(filename)
+            cached = _configs_file_cache.get(filename)
+            if cached is not None and cached[0] == mtime:
+                entry = cached[1]
+            else:
+                entry = _build_config_entry(filename, os.path.join(config_dir, filename))
+                _configs_file_cache[filename] = (mtime, entry)
+            if entry is not None:
+                configs.append(entry)
 
-                configs.append({
-                    'filename': filename,
-                    'filepath': filepath,
-                    'name': name,
-                    'type': config_type,
-                    'description': config.get('description', ''),
-                    'config': config
-                })
-            except Exception as e:
-                print(f"Error loading {filename}: {e}")
-                continue
+        for stale in set(_configs_file_cache) - seen:
+            del _configs_file_cache[stale]
 
         configs.sort(key=lambda x: x['name'])
+        _configs_cache['data'] = configs
+        _configs_cache['sig'] = sig
         return configs
 
     def get_example_configs() -> list:
-        """Get example configs from examples directory"""
-        examples = []
+        """Get example configs from examples directory (cached; these
+        almost never change, so a whole-directory rebuild on any mtime
+        bump is fine)"""
         if not os.path.exists(examples_dir):
-            return examples
+            return []
 
-        for filename in os.listdir(examples_dir):
-            if not filename.endswith('.json'):
-                continue
+        try:
+            sig = tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(examples_dir)
+                if entry.name.endswith('.json')
+            ))
+        except OSError:
+            return []
+
+        if sig == _examples_cache['sig']:
+            return _examples_cache['data']
+
+        examples = []
+        for filename, _ in sig:
             filepath = os.path.join(examples_dir, filename)
             try:
                 with open(filepath, 'r') as f:
@@ -110,6 +159,9 @@ def create_config_editor_blueprint(config_dir: str, examples_dir: str, bots_dir:
                 })
             except:
                 continue
+
+        _examples_cache['data'] = examples
+        _examples_cache['sig'] = sig
         return examples
 
     # ========================================================================
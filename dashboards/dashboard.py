@@ -206,10 +206,13 @@ window.__vtEmergencyStop = async function() {
 <!-- AI Chat Panel (loaded dynamically) -->
 <div id="aiChatContainer"></div>
 <script>
-fetch('/ai/chat-panel')
-    .then(r => r.text())
+// Share one in-flight fetch across mounts (SPA-style nav, duplicate
+// injection) so concurrent callers ride the same request
+window.__chatPanelPromise = window.__chatPanelPromise || fetch('/ai/chat-panel').then(r => r.text());
+window.__chatPanelPromise
     .then(html => {
         const container = document.getElementById('aiChatContainer');
+        if (!container || container.childElementCount > 0) return;  // already mounted
         container.innerHTML = html;
         container.querySelectorAll('script').forEach(oldScript => {
             const newScript = document.createElement('script');
@@ -13,14 +13,19 @@ Usage:
     state = cached_call('user_state:0xABC', info.user_state, ttl=30, args=('0xABC',))
 """
 
+import os
 import time
 import threading
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
+from requests.adapters import HTTPAdapter, Retry
 
 # Known HIP-3 builder dex prefixes
 KNOWN_DEXES = ["", "xyz", "flx"]
 
+# TTL for slow-moving metadata endpoints (meta/spot_meta), overridable via env
+META_TTL = int(os.environ.get('HL_META_TTL', '300'))
+
 # Module-level cache: { key: (data, expiry_time) }
 _cache = {}
 _cache_lock = threading.Lock()
@@ -36,11 +41,21 @@ def get_info():
     if _info_instance is None:
         with _info_lock:
             if _info_instance is None:
-                _info_instance = Info(
+                info = Info(
                     constants.MAINNET_API_URL,
                     skip_ws=True,
                     perp_dexs=KNOWN_DEXES
                 )
+                # Pool connections so concurrent callers reuse warm TLS
+                # sockets instead of paying a handshake per request
+                adapter = HTTPAdapter(
+                    pool_connections=32,
+                    pool_maxsize=32,
+                    max_retries=Retry(total=1, backoff_factor=0.1),
+                )
+                info.session.mount('https://', adapter)
+                info.session.mount('http://', adapter)
+                _info_instance = info
     return _info_instance
 
 
@@ -87,8 +102,8 @@ def invalidate(key=None):
 # Convenience wrappers for common expensive calls
 # ============================================================
 
-def get_meta(dex="", ttl=300):
-    """Get perp metadata (cached 5 minutes)."""
+def get_meta(dex="", ttl=META_TTL):
+    """Get perp metadata (cached META_TTL seconds, default 5 minutes)."""
     info = get_info()
     return cached_call(f'meta:{dex}', info.meta, ttl=ttl, kwargs={'dex': dex})
 
@@ -147,7 +162,44 @@ def get_user_fills(address, ttl=30):
     )
 
 
-def get_spot_meta(ttl=300):
-    """Get spot metadata (cached 5 minutes)."""
+def get_spot_meta(ttl=META_TTL):
+    """Get spot metadata (cached META_TTL seconds, default 5 minutes)."""
     info = get_info()
     return cached_call('spot_meta', info.spot_meta, ttl=ttl)
+
+
+# ============================================================
+# Derived lookup indexes (rebuilt once per cache refresh, so
+# symbol lookups are O(1) dict hits instead of universe scans)
+# ============================================================
+
+def get_perp_index(dex="", ttl=META_TTL):
+    """Uppercase coin name -> (position, market) over the perp universe."""
+    def build():
+        universe = get_meta(dex, ttl=ttl).get('universe', [])
+        return {m['name'].upper(): (i, m) for i, m in enumerate(universe)}
+    return cached_call(f'perp_index:{dex}', build, ttl=ttl)
+
+
+def get_perp_ctx_index(ttl=60):
+    """Uppercase coin name -> position into get_meta_and_asset_ctxs."""
+    def build():
+        universe = get_meta_and_asset_ctxs(ttl=ttl)[0]['universe']
+        return {m['name'].upper(): i for i, m in enumerate(universe)}
+    return cached_call('perp_ctx_index', build, ttl=ttl)
+
+
+def get_spot_index(ttl=META_TTL):
+    """Prebuilt spot metadata lookups: exact-name and index dicts, plus
+    uppercase (name, obj) pairs so substring scans skip per-call .upper()."""
+    def build():
+        spot_meta = get_spot_meta(ttl=ttl)
+        tokens = spot_meta.get('tokens', [])
+        universe = spot_meta.get('universe', [])
+        return {
+            'token_by_name': {t.get('name', '').upper(): t for t in tokens},
+            'token_by_index': {t['index']: t for t in tokens},
+            'tokens_upper': [(t.get('name', '').upper(), t) for t in tokens],
+            'universe_upper': [(m.get('name', '').upper(), m) for m in universe],
+        }
+    return cached_call('spot_index', build, ttl=ttl)
@@ -3,14 +3,20 @@ Metrics Capture Module
 Handles 1-minute boundary snapshots for time-series analytics
 """
 
+import os
 import sqlite3
 import time
+import traceback
 from datetime import datetime, timedelta, timezone
 from threading import Thread
 from typing import Dict, Any, Optional, Callable
 
 DATABASE_PATH = "trading_data.db"
 
+# Keep the worker thread quiet unless debugging: every print takes the GIL
+# and a stdout write away from the trading loop
+DEBUG = os.environ.get('MM_DEBUG', '0') == '1'
+
 class MetricsCapture:
     """Captures metrics every minute at boundary"""
 
@@ -27,6 +33,7 @@ class MetricsCapture:
         self.worker_thread = None
         self.running = False
         self.last_snapshot = None
+        self._conn = None  # Reused by the worker thread across snapshots
 
         # Cumulative counters (reset on bot restart or midnight)
         self.cumulative_fills = 0
@@ -50,8 +57,21 @@ class MetricsCapture:
         self.running = False
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
         print(f"✓ Metrics capture stopped for {self.pair}")
 
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get the worker thread's persistent database connection"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(DATABASE_PATH)
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+
     def _snapshot_worker(self):
         """Worker thread that captures metrics every minute"""
         print(f"   Metrics worker running for {self.pair}")
@@ -64,17 +84,18 @@ class MetricsCapture:
 
                 # Sleep until boundary
                 sleep_seconds = (next_minute - now).total_seconds()
-                print(f"   [METRICS DEBUG] Sleeping {sleep_seconds:.1f}s until {next_minute.strftime('%H:%M:%S')}")
+                if DEBUG:
+                    print(f"   [METRICS DEBUG] Sleeping {sleep_seconds:.1f}s until {next_minute.strftime('%H:%M:%S')}")
                 time.sleep(sleep_seconds)
 
                 # Capture snapshot (now guaranteed to be on :00 boundary)
                 if self.running:  # Check again in case stopped during sleep
-                    print(f"   [METRICS DEBUG] Attempting capture at {datetime.now(timezone.utc).strftime('%H:%M:%S')}")
+                    if DEBUG:
+                        print(f"   [METRICS DEBUG] Attempting capture at {datetime.now(timezone.utc).strftime('%H:%M:%S')}")
                     self.capture_snapshot()
 
             except Exception as e:
                 print(f"   ⚠️  Error in metrics worker: {e}")
-                import traceback
                 traceback.print_exc()
                 time.sleep(60)  # Wait a minute before retrying
 
@@ -178,7 +199,6 @@ class MetricsCapture:
 
         except Exception as e:
             print(f"   ⚠️  Error capturing metrics: {e}")
-            import traceback
             traceback.print_exc()
 
     def _get_fills_since_last_snapshot(self, current_timestamp: datetime) -> Dict[str, Any]:
@@ -189,8 +209,7 @@ class MetricsCapture:
         else:
             start_time = self.last_snapshot['timestamp']
 
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_conn()
         cursor = conn.cursor()
 
         try:
@@ -226,12 +245,10 @@ class MetricsCapture:
 
         finally:
             cursor.close()
-            conn.close()
 
     def _insert_metrics(self, metrics: Dict[str, Any]):
         """Insert metrics record to database"""
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_conn()
         cursor = conn.cursor()
 
         try:
@@ -300,7 +317,6 @@ class MetricsCapture:
 
         finally:
             cursor.close()
-            conn.close()
 
     def reset_cumulatives(self):
         """Reset cumulative counters (call at midnight or bot restart)"""
@@ -5,11 +5,13 @@ Handles bot configuration versioning and tracking
 
 import hashlib
 import json
+import os
 import sqlite3
 from datetime import datetime, timezone
 from typing import Dict, Optional, Any
 
 DATABASE_PATH = "trading_data.db"
+HASH_SIDECAR_PATH = ".last_config_hash"  # pair -> config hash, JSON
 
 class ParameterManager:
     """Manages bot configuration versions and changes"""
@@ -17,17 +19,21 @@ class ParameterManager:
     def __init__(self, pair: str):
         self.pair = pair
         self.current_param_set_id = None
+        self._last_config_hash = None  # Short-circuits repeat change checks
 
         # Load last used parameter set ID from database
         self._load_last_param_set_id()
 
-    def register_config(self, config: Dict[str, Any], description: str = None) -> int:
+    def register_config(self, config: Dict[str, Any], description: str = None,
+                        config_hash: str = None) -> int:
         """
         Register a configuration and return its parameter_set_id
 
         Args:
             config: Dictionary of configuration parameters
             description: Optional human-readable description
+            config_hash: Precomputed hash of config (with pair), to avoid
+                         hashing twice when the caller already has it
 
         Returns:
             parameter_set_id (int)
@@ -35,8 +41,9 @@ class ParameterManager:
         # Add pair to config
         config_with_pair = {**config, 'pair': self.pair}
 
-        # Calculate hash
-        config_hash = self._calculate_hash(config_with_pair)
+        # Calculate hash (unless the caller already did)
+        if config_hash is None:
+            config_hash = self._calculate_hash(config_with_pair)
 
         # Check if this exact config already exists
         existing_id = self._find_existing_config(config_hash)
@@ -112,7 +119,20 @@ class ParameterManager:
         Returns:
             New parameter_set_id if changed, None if unchanged
         """
-        new_param_set_id = self.register_config(current_config)
+        # Hash first: if the config matches the last one seen by this
+        # instance or recorded in the sidecar file from a previous run, skip
+        # the SELECT/INSERT round-trips entirely
+        config_hash = self._calculate_hash({**current_config, 'pair': self.pair})
+        if self.current_param_set_id is not None:
+            if config_hash == self._last_config_hash:
+                return None
+            if config_hash == self._read_sidecar_hash():
+                self._last_config_hash = config_hash
+                return None
+
+        new_param_set_id = self.register_config(current_config, config_hash=config_hash)
+        self._last_config_hash = config_hash
+        self._write_sidecar_hash(config_hash)
 
         if self.current_param_set_id is None:
             # First run
@@ -145,6 +165,30 @@ class ParameterManager:
 
     # ========== Private Methods ==========
 
+    def _read_sidecar_hash(self) -> Optional[str]:
+        """Read this pair's last config hash from the sidecar file"""
+        try:
+            with open(HASH_SIDECAR_PATH) as f:
+                return json.load(f).get(self.pair)
+        except (OSError, ValueError):
+            return None
+
+    def _write_sidecar_hash(self, config_hash: str):
+        """Atomically record this pair's config hash in the sidecar file"""
+        try:
+            try:
+                with open(HASH_SIDECAR_PATH) as f:
+                    hashes = json.load(f)
+            except (OSError, ValueError):
+                hashes = {}
+            hashes[self.pair] = config_hash
+            tmp_path = HASH_SIDECAR_PATH + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(hashes, f)
+            os.replace(tmp_path, HASH_SIDECAR_PATH)
+        except OSError as e:
+            print(f"   ⚠️  Could not write config hash sidecar: {e}")
+
     def _calculate_hash(self, config: Dict[str, Any]) -> str:
         """Calculate SHA256 hash of configuration"""
         # Sort keys for consistent hashing
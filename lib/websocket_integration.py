@@ -3,6 +3,9 @@ WebSocket Integration for Market Maker Bots
 Wraps Hyperliquid WebSocket API for real-time market data and fill notifications
 """
 
+import os
+import queue
+import random
 import threading
 import time
 from typing import Dict, Optional, Callable
@@ -10,6 +13,10 @@ from datetime import datetime, timezone
 from hyperliquid.websocket_manager import WebsocketManager
 from hyperliquid.utils import constants
 
+# Gate diagnostic prints so the hot WebSocket callbacks skip the f-string
+# formatting entirely unless MM_DEBUG=1 (same flag as the bots)
+DEBUG = os.environ.get('MM_DEBUG', '0') == '1'
+
 
 class MarketDataWebSocket:
     """
@@ -45,7 +52,8 @@ class MarketDataWebSocket:
         self._orderbook_data: Optional[Dict] = None
         self._last_orderbook_update = None
         self._new_fills = []
-        self._balances: Optional[Dict] = None
+        self._balances: Optional[Dict] = None  # coin -> {"total", "hold"} from webData2
+        self._last_balance_update = None
 
         # Update flags for event-driven behavior
         self._orderbook_updated = False
@@ -54,6 +62,20 @@ class MarketDataWebSocket:
         # Event for instant wake-up (blocks main thread until update)
         self._update_event = threading.Event()
 
+        # Typed event queue: one blocking get per wake-up instead of an Event
+        # wait followed by a flag poll (see get_event). Only enqueue once a
+        # consumer has opted in via get_event/enable_stale_timer - legacy
+        # callers (wait_for_update/check_updates) never drain the queue, so
+        # it would grow without bound
+        self._event_q = queue.SimpleQueue()
+        self._event_q_enabled = False
+
+        # Optional one-shot staleness timer: rescheduled on every real event,
+        # it pushes a 'timeout' wake only when the stream actually goes quiet
+        # (see enable_stale_timer)
+        self._stale_timeout = None
+        self._stale_timer = None
+
         # Debug counters
         self._orderbook_update_count = 0
         self._last_debug_log = time.time()
@@ -65,6 +87,7 @@ class MarketDataWebSocket:
         # Connection state
         self.connected = False
         self.error_count = 0
+        self._backoff_s = 0.1  # Reconnect backoff, doubles per failure (5s cap)
 
     def start(self):
         """Start WebSocket connections and subscriptions"""
@@ -112,6 +135,15 @@ class MarketDataWebSocket:
             )
             self.subscription_ids.append(events_sub_id)
 
+            # Subscribe to webData2 (pushes account state incl. spot balances,
+            # so bots can read balances from cache instead of polling REST)
+            print(f"   💼 Subscribing to account state (webData2)...")
+            webdata_sub_id = self.ws_manager.subscribe(
+                subscription={"type": "webData2", "user": self.account_address},
+                callback=self._on_web_data
+            )
+            self.subscription_ids.append(webdata_sub_id)
+
             self.connected = True
             print("   ✅ WebSocket connected and subscribed")
 
@@ -133,6 +165,9 @@ class MarketDataWebSocket:
 
     def stop(self):
         """Stop WebSocket connections"""
+        if self._stale_timer is not None:
+            self._stale_timer.cancel()
+            self._stale_timer = None
         if self.ws_manager:
             print("🔌 Disconnecting WebSocket...")
             # Unsubscribe from all
@@ -151,13 +186,14 @@ class MarketDataWebSocket:
             self._orderbook_update_count += 1
 
             # Debug: Log first few messages to verify callbacks work
-            if self._orderbook_update_count <= 3:
+            if DEBUG and self._orderbook_update_count <= 3:
                 print(f"   [WS DEBUG] Orderbook callback #{self._orderbook_update_count} received!")
                 print(f"      Message: {str(msg)[:200]}...")
 
             # Debug: Log update rate every 30 seconds
             if time.time() - self._last_debug_log > 30:
-                print(f"   [WS DEBUG] Received {self._orderbook_update_count} orderbook updates in last 30s")
+                if DEBUG:
+                    print(f"   [WS DEBUG] Received {self._orderbook_update_count} orderbook updates in last 30s")
                 self._orderbook_update_count = 0
                 self._last_debug_log = time.time()
 
@@ -215,6 +251,9 @@ class MarketDataWebSocket:
                 # Only set update flag if first update OR significant price change
                 if first_update or significant_change:
                     self._orderbook_updated = True
+                    if self._event_q_enabled:
+                        self._event_q.put('orderbook')
+                    self._arm_stale_timer()
                     self._update_event.set()  # Wake up main thread instantly!
 
                 # Debug: Show first orderbook update
@@ -238,7 +277,7 @@ class MarketDataWebSocket:
             fills = data.get("fills", [])
 
             # Debug: Log all fills received
-            if fills:
+            if DEBUG and fills:
                 print(f"   [WS DEBUG] Received {len(fills)} fill(s) from WebSocket")
                 for fill in fills:
                     print(f"      - Coin: {fill.get('coin')}, Side: {fill.get('side')}, Size: {fill.get('sz')}, Price: {fill.get('px')}")
@@ -269,13 +308,17 @@ class MarketDataWebSocket:
                         self._new_fills.append(fill)
                         print(f"   🔔 Fill detected: {fill.get('side')} {fill.get('sz')} @ ${fill.get('px')}")
                     else:
-                        print(f"   [WS DEBUG] Skipping fill for different coin: {fill_coin} (expecting {self.spot_coin} or {spot_coin_base})")
+                        if DEBUG:
+                            print(f"   [WS DEBUG] Skipping fill for different coin: {fill_coin} (expecting {self.spot_coin} or {spot_coin_base})")
 
                 # Check if any fills match our market (with HIP-3 handling)
                 spot_coin_base = self.spot_coin.split(':')[-1] if ':' in self.spot_coin else self.spot_coin
                 our_fills = [f for f in fills if f.get("coin") in [self.spot_coin, spot_coin_base, self.pair_name]]
                 if our_fills:
                     self._fills_received = True
+                    if self._event_q_enabled:
+                        self._event_q.put('fills')
+                    self._arm_stale_timer()
                     self._update_event.set()  # Wake up main thread instantly!
 
             # Trigger callback if we got fills for our market
@@ -286,6 +329,23 @@ class MarketDataWebSocket:
             print(f"   ⚠️  Error processing fill: {e}")
             self.error_count += 1
 
+    def _on_web_data(self, msg):
+        """Handle webData2 account-state push (spot balances)"""
+        try:
+            data = msg.get("data", {})
+            balances = data.get("spotState", {}).get("balances", [])
+            if not balances:
+                return
+
+            indexed = {b.get("coin"): b for b in balances}
+            with self._state_lock:
+                self._balances = indexed
+                self._last_balance_update = time.time()
+
+        except Exception as e:
+            print(f"   ⚠️  Error processing webData2: {e}")
+            self.error_count += 1
+
     def _on_user_event(self, msg):
         """Handle user event (balance updates, etc.)"""
         try:
@@ -318,6 +378,22 @@ class MarketDataWebSocket:
         with self._orderbook_lock:
             return self._orderbook_data.copy() if self._orderbook_data else None
 
+    def get_spot_balances(self) -> Optional[Dict]:
+        """
+        Get cached spot balances pushed via webData2
+
+        Returns:
+            Dict with 'balances' (coin -> entry) and 'age' in seconds,
+            or None if no push has arrived yet
+        """
+        with self._state_lock:
+            if not self._balances:
+                return None
+            return {
+                "balances": dict(self._balances),
+                "age": time.time() - self._last_balance_update,
+            }
+
     def get_new_fills(self) -> list:
         """
         Get and clear new fills queue
@@ -355,6 +431,80 @@ class MarketDataWebSocket:
 
         return updates
 
+    def enable_stale_timer(self, seconds: float):
+        """
+        Arm a one-shot staleness timer instead of relying on get_event
+        timeouts
+
+        The timer is rescheduled on every real event and fires only when the
+        stream goes quiet for the given interval, pushing a 'timeout' wake
+        onto the event queue - so idle periods cost one kernel-scheduled wake
+        instead of a spurious timeout per interval.
+        """
+        self._event_q_enabled = True
+        self._stale_timeout = seconds
+        self._arm_stale_timer()
+
+    def _arm_stale_timer(self):
+        """(Re)schedule the one-shot staleness timer"""
+        if self._stale_timeout is None:
+            return
+        if self._stale_timer is not None:
+            self._stale_timer.cancel()
+        self._stale_timer = threading.Timer(self._stale_timeout, self._signal_stale)
+        self._stale_timer.daemon = True
+        self._stale_timer.start()
+
+    def _signal_stale(self):
+        """Stale-timer callback: wake the main thread and re-arm"""
+        self._event_q.put('timeout')
+        self._arm_stale_timer()
+
+    def get_event(self, timeout: float = None, coalesce: float = 0.0) -> Dict[str, bool]:
+        """
+        Block until the next update event and return merged trigger flags
+
+        One queue.get per wake-up (no spurious wakes, no follow-up flag
+        poll); any events that arrived in the same burst are drained and
+        merged into the returned dict.
+
+        Args:
+            timeout: Max seconds to wait (None = wait forever)
+            coalesce: After the first event, keep absorbing follow-up events
+                for up to this many seconds so a burst of ticks triggers one
+                quote update instead of one per tick
+
+        Returns:
+            Dict with 'orderbook' and 'fills' boolean flags (both False on
+            timeout)
+        """
+        self._event_q_enabled = True
+        updates = {'orderbook': False, 'fills': False}
+        try:
+            updates[self._event_q.get(timeout=timeout)] = True
+        except queue.Empty:
+            return updates
+
+        deadline = time.monotonic() + coalesce
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    updates[self._event_q.get(timeout=remaining)] = True
+                else:
+                    updates[self._event_q.get_nowait()] = True
+            except queue.Empty:
+                break
+
+        # Keep the legacy flag/Event state consistent for check_updates callers
+        with self._orderbook_lock:
+            self._orderbook_updated = False
+        with self._fills_lock:
+            self._fills_received = False
+        self._update_event.clear()
+
+        return updates
+
     def wait_for_update(self, timeout: float = None) -> bool:
         """
         Block until an update occurs (orderbook or fill)
@@ -403,10 +553,17 @@ class MarketDataWebSocket:
         try:
             self.start()
             print("   ✅ WebSocket reconnected successfully")
+            self._backoff_s = 0.1  # Reset backoff on success
             return True
         except Exception as e:
             print(f"   ❌ WebSocket reconnection failed: {e}")
             self.connected = False
+            # Exponential backoff with jitter so repeated failures during an
+            # outage don't spin the outer loop into a reconnect storm
+            delay = min(5.0, self._backoff_s) * (0.5 + random.random())
+            self._backoff_s = min(10.0, self._backoff_s * 2)
+            print(f"   ⏳ Backing off {delay:.1f}s before next attempt")
+            time.sleep(delay)
             return False
 
     def get_stats(self) -> Dict:
@@ -0,0 +1,15 @@
+-- Migration 004: Add derived epoch timestamp columns
+-- Purpose: Let time-window queries compare integers instead of TEXT
+-- timestamps. Integer predicates are cheaper per row and immune to
+-- format drift between writers (with/without fractional seconds or
+-- timezone suffix).
+--
+-- VIRTUAL (not STORED) because SQLite only allows adding VIRTUAL
+-- generated columns via ALTER TABLE; an index over the column (005)
+-- materializes the values anyway.
+
+ALTER TABLE fills ADD COLUMN ts_epoch INTEGER
+    GENERATED ALWAYS AS (CAST(strftime('%s', timestamp) AS INTEGER)) VIRTUAL;
+
+ALTER TABLE metrics_1min ADD COLUMN ts_epoch INTEGER
+    GENERATED ALWAYS AS (CAST(strftime('%s', timestamp) AS INTEGER)) VIRTUAL;
@@ -0,0 +1,8 @@
+-- Migration 005: Index the generated epoch columns
+-- Purpose: The performance-metrics window query filters on
+-- (pair, ts_epoch); without an index that is a full scan evaluating
+-- strftime per row. These composite indexes turn it into a short
+-- B-tree range scan and materialize the virtual ts_epoch values.
+
+CREATE INDEX IF NOT EXISTS idx_fills_pair_tsepoch ON fills(pair, ts_epoch);
+CREATE INDEX IF NOT EXISTS idx_metrics_1min_pair_tsepoch ON metrics_1min(pair, ts_epoch);